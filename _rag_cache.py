@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Shared MindShiftRAG instance cache for the test scripts
+Building and initializing the system is the expensive part of every RAG
+test, so it is paid once per (docs_dir, persist_dir) and reused
+"""
+
+import atexit
+import functools
+
+from mindshift_rag import MindShiftRAG
+
+@functools.lru_cache(maxsize=4)
+def get_rag(docs_dir: str = "./som_documents", persist_dir: str = "./chroma_db") -> MindShiftRAG:
+    """Return a fully initialized MindShiftRAG, memoized per configuration"""
+    rag_system = MindShiftRAG(persist_dir=persist_dir)
+    rag_system.initialize_system(docs_dir)
+    return rag_system
+
+# Drop the cached instances (and their Chroma handles) at interpreter exit
+atexit.register(get_rag.cache_clear)
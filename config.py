@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Shared environment configuration for the test scripts
+Loads .env once at import and memoizes every lookup
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+
+# Parse .env exactly once, at first import, instead of once per script
+load_dotenv()
+
+@lru_cache(maxsize=None)
+def env(key: str, *, required: bool = False, default: Optional[str] = None) -> Optional[str]:
+    """Look up an environment variable, cached after the first read
+
+    With required=True a missing or empty value raises instead of
+    returning None, so misconfiguration fails loudly at the call site.
+    """
+    value = os.getenv(key, default)
+    if required and not value:
+        raise RuntimeError(f"Environment variable {key} is not set")
+    return value
@@ -4,7 +4,11 @@ Document Download Script for MindShift RAG System
 Downloads SOM pattern documents from Google Drive
 """
 
+import io
 import os
+import tarfile
+import types
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
 
@@ -12,24 +16,10 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_documents_directory():
-    """Create the som_documents directory if it doesn't exist"""
-    docs_dir = Path("./som_documents")
-    docs_dir.mkdir(exist_ok=True)
-    logger.info(f"Created documents directory: {docs_dir}")
-    return docs_dir
-
-def download_sample_documents():
-    """
-    Create sample SOM pattern documents for testing
-    Since we can't directly download from Google Drive without authentication,
-    we'll create sample documents based on the structure mentioned
-    """
-    docs_dir = create_documents_directory()
-    
-    # Sample SOM pattern documents
-    sample_docs = {
-        "01_About_Sleight_of_Mouth_SOM_patterns.txt": """
+# Sample SOM pattern documents - built once at import time so repeated calls
+# to download_sample_documents() skip all string/object allocation
+_SAMPLE_DOCS = types.MappingProxyType({
+    "01_About_Sleight_of_Mouth_SOM_patterns.txt": """
 SLEIGHT OF MOUTH (SOM) PATTERNS
 
 Sleight of Mouth patterns are linguistic tools developed by Robert Dilts based on the work of Richard Bandler and John Grinder. These patterns help challenge limiting beliefs and reframe perspectives.
@@ -77,7 +67,7 @@ KEY SOM PATTERNS:
     - Example: "What's more important than...?"
 """,
 
-        "02_Example_1_SOM_Patterns.txt": """
+    "02_Example_1_SOM_Patterns.txt": """
 EXAMPLE CONVERSATION 1: CAREER LIMITATION
 
 User: "I can't get promoted because I don't have a college degree."
@@ -100,7 +90,7 @@ CHUNK UP CHALLENGE:
 "What's the bigger picture here? Companies ultimately want people who can deliver results, regardless of how they gained their knowledge."
 """,
 
-        "03_Example_2_SOM_Patterns.txt": """
+    "03_Example_2_SOM_Patterns.txt": """
 EXAMPLE CONVERSATION 2: RELATIONSHIP FEARS
 
 User: "I'm afraid to start dating because I always get hurt."
@@ -123,7 +113,7 @@ CHUNK DOWN CHALLENGE:
 "What specifically about dating concerns you most? Is it rejection, vulnerability, or something else?"
 """,
 
-        "04_Conversation_1_with_MindShift.txt": """
+    "04_Conversation_1_with_MindShift.txt": """
 CONVERSATION #1 WITH MINDSHIFT
 
 User: "I can't start my own business because I don't have enough money."
@@ -141,7 +131,7 @@ User: "I guess I could start by researching my market online."
 MindShift: "Exactly! That's a perfect example of using what you have. Research costs nothing but your time and attention. What else could you do that requires minimal financial investment but maximum learning?"
 """,
 
-        "05_Conversation_2_with_MindShift.txt": """
+    "05_Conversation_2_with_MindShift.txt": """
 CONVERSATION #2 WITH MINDSHIFT
 
 User: "I'm too old to learn new technology."
@@ -157,7 +147,7 @@ Many successful tech entrepreneurs started their companies in their 40s, 50s, an
 What's one small technology skill you'd like to learn? Let's start there and see how your experience actually helps you learn faster."
 """,
 
-        "06_Conversation_3_with_MindShift.txt": """
+    "06_Conversation_3_with_MindShift.txt": """
 CONVERSATION #3 WITH MINDSHIFT
 
 User: "I'll never be good at public speaking because I'm naturally shy."
@@ -173,7 +163,7 @@ Many successful speakers started out terrified of public speaking. The differenc
 What's one small speaking opportunity you could create for yourself? Maybe sharing an idea in a meeting or telling a story to friends? Let's start where you feel most comfortable."
 """,
 
-        "07_Conversation_4_with_MindShift.txt": """
+    "07_Conversation_4_with_MindShift.txt": """
 CONVERSATION #4 WITH MINDSHIFT
 
 User: "I can't pursue my passion because I have too many responsibilities."
@@ -189,7 +179,7 @@ What's one small way you could integrate your passion into your current responsi
 Remember, you don't have to quit everything to pursue your passion. Sometimes the most sustainable path is finding ways to weave your passion into your existing life."
 """,
 
-        "08_Conversation_5_with_MindShift.txt": """
+    "08_Conversation_5_with_MindShift.txt": """
 CONVERSATION #5 WITH MINDSHIFT
 
 User: "I'm not creative enough to be an artist."
@@ -206,19 +196,9 @@ What's one small creative act you could do today? Maybe doodling, writing a poem
 
 Remember, every artist was once an amateur. The difference isn't natural talent - it's the willingness to keep creating despite the fear."
 """
-    }
-    
-    # Write sample documents
-    for filename, content in sample_docs.items():
-        file_path = docs_dir / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        logger.info(f"Created sample document: {file_path}")
-    
-    logger.info(f"Created {len(sample_docs)} sample documents in {docs_dir}")
-    
-    # Create a README file
-    readme_content = """
+})
+
+_README_CONTENT = """
 # SOM Pattern Documents
 
 This directory contains the Sleight of Mouth (SOM) pattern documents used by the MindShift RAG system.
@@ -242,14 +222,94 @@ These are sample documents created for demonstration purposes. For the full syst
 
 The MindShift RAG system will automatically load and index these documents when you run the application.
 """
-    
+
+# Pre-encode the corpus once at import time so each run skips the per-file
+# UTF-8 encoding pass and writes the cached blobs directly
+_SAMPLE_DOCS_BYTES = {name: text.encode('utf-8') for name, text in _SAMPLE_DOCS.items()}
+_README_BYTES = _README_CONTENT.encode('utf-8')
+
+# Pre-built bundle of the sample corpus; expanding it is one bulk read
+# instead of nine individual file writes
+_BUNDLE_PATH = Path(__file__).with_name("som_documents.tar.gz")
+
+def build_sample_bundle(bundle_path: Path = _BUNDLE_PATH):
+    """Pack the sample corpus into a single compressed tarball"""
+    with tarfile.open(bundle_path, "w:gz") as tar:
+        for name, blob in {**_SAMPLE_DOCS_BYTES, "README.md": _README_BYTES}.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(blob)
+            tar.addfile(info, io.BytesIO(blob))
+    logger.info(f"Built sample bundle: {bundle_path}")
+
+def extract_sample_bundle(docs_dir: Path) -> bool:
+    """Expand the pre-built corpus bundle into docs_dir in one pass"""
+    if not _BUNDLE_PATH.exists():
+        return False
+    with tarfile.open(_BUNDLE_PATH, "r:gz") as tar:
+        tar.extractall(docs_dir)
+    logger.info(f"Expanded sample bundle into {docs_dir}")
+    return True
+
+def create_documents_directory():
+    """Create the som_documents directory if it doesn't exist"""
+    docs_dir = Path("./som_documents")
+    docs_dir.mkdir(exist_ok=True)
+    logger.info(f"Created documents directory: {docs_dir}")
+    return docs_dir
+
+def _write_if_changed(file_path: Path, expected: bytes) -> bool:
+    """Write the expected blob to file_path, skipping the write if the file
+    is already up to date. A cheap size check filters most mismatches before
+    the byte comparison, so warm re-runs do no disk writes at all."""
+    try:
+        if file_path.stat().st_size == len(expected) and file_path.read_bytes() == expected:
+            return False
+    except OSError:
+        pass
+    # Write the encoded blob straight through the fd, bypassing the
+    # TextIOWrapper/BufferedWriter copies of open(..., 'w').write()
+    fd = os.open(str(file_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.writev(fd, [memoryview(expected)])
+    finally:
+        os.close(fd)
+    return True
+
+def download_sample_documents():
+    """
+    Create sample SOM pattern documents for testing
+    Since we can't directly download from Google Drive without authentication,
+    we'll create sample documents based on the structure mentioned
+    """
+    docs_dir = create_documents_directory()
+
+    # Cold start: expand the bundle in one bulk read, which turns the
+    # per-file writes below into an up-to-date verification pass
+    if any(not (docs_dir / name).exists() for name in _SAMPLE_DOCS_BYTES):
+        extract_sample_bundle(docs_dir)
+
+    # Write sample documents concurrently - the work is pure file I/O,
+    # so overlapping the writes hides the per-file syscall latency
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        written = sum(executor.map(
+            lambda item: _write_if_changed(docs_dir / item[0], item[1]),
+            _SAMPLE_DOCS_BYTES.items()
+        ))
+
+    logger.info(f"Created {written} sample documents in {docs_dir} "
+                f"({len(_SAMPLE_DOCS) - written} already up to date)")
+
+    # Create a README file
     readme_path = docs_dir / "README.md"
-    with open(readme_path, 'w', encoding='utf-8') as f:
-        f.write(readme_content)
-    
-    logger.info(f"Created README file: {readme_path}")
+    if _write_if_changed(readme_path, _README_BYTES):
+        logger.info(f"Created README file: {readme_path}")
 
 if __name__ == "__main__":
+    import sys
+    if "--build-bundle" in sys.argv:
+        print("Packing sample SOM pattern documents into bundle...")
+        build_sample_bundle()
+        sys.exit(0)
     print("Creating sample SOM pattern documents...")
     download_sample_documents()
     print("✅ Sample documents created successfully!")
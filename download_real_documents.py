@@ -5,17 +5,18 @@ Downloads actual SOM pattern documents from Google Drive
 """
 
 import os
+import re
 import requests
-import zipfile
 from pathlib import Path
 import logging
-from urllib.parse import urlparse, parse_qs
-import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Matches the folder ID in both .../folders/<id> and ...?id=<id> URL forms
+_FOLDER_ID_RE = re.compile(r'(?:folders/|id=)([A-Za-z0-9_-]+)')
+
 class GoogleDriveDownloader:
     """Downloads documents from Google Drive folder"""
     
@@ -26,12 +27,10 @@ class GoogleDriveDownloader:
         
     def extract_folder_id(self, url: str) -> str:
         """Extract folder ID from Google Drive URL"""
-        if 'folders/' in url:
-            return url.split('folders/')[1].split('?')[0]
-        elif 'id=' in url:
-            return url.split('id=')[1].split('&')[0]
-        else:
+        match = _FOLDER_ID_RE.search(url)
+        if not match:
             raise ValueError("Invalid Google Drive folder URL")
+        return match.group(1)
     
     def get_folder_contents(self, folder_id: str) -> list:
         """Get list of files in Google Drive folder"""
@@ -39,17 +38,14 @@ class GoogleDriveDownloader:
             # Use Google Drive API to get folder contents
             api_url = f"https://drive.google.com/drive/folders/{folder_id}"
             
-            # Alternative approach: Use gdown for Google Drive downloads
-            import subprocess
-            import sys
-            
-            # Install gdown if not available
-            try:
-                import gdown
-            except ImportError:
-                logger.info("Installing gdown for Google Drive downloads...")
-                subprocess.check_call([sys.executable, "-m", "pip", "install", "gdown"])
-                import gdown
+            # Alternative approach: Use gdown for Google Drive downloads.
+            # gdown is declared in requirements.txt, so probe for it instead
+            # of spawning a pip subprocess on the cold path
+            import importlib.util
+            if importlib.util.find_spec("gdown") is None:
+                logger.error("gdown is not installed. Run: pip install gdown")
+                return False
+            import gdown
             
             # Download folder as zip
             zip_path = self.output_dir / "som_documents.zip"
@@ -121,34 +117,70 @@ Alternative: Install python-docx and modify the system to read .docx directly
 def create_docx_reader():
     """Create a script to read .docx files directly"""
     docx_reader_code = '''
+import gc
+import io
+import json
 import os
 from pathlib import Path
 from docx import Document
 
-def read_docx_files(directory: str) -> dict:
-    """Read all .docx files from directory and return content"""
+def read_docx_files(directory: str, stream_path: str = None, flush_every: int = 64) -> dict:
+    """Read all .docx files from directory and return content.
+
+    With stream_path set, each document is appended to a JSON-lines file as
+    soon as it is parsed instead of being accumulated in the returned dict,
+    so memory stays bounded no matter how large the corpus grows.
+    """
     docs_content = {}
     docs_dir = Path(directory)
-    
+
     if not docs_dir.exists():
         print(f"Directory {directory} does not exist")
         return docs_content
-    
+
+    stream = open(stream_path, "w", encoding="utf-8") if stream_path else None
+    parsed = 0
+
     for docx_file in docs_dir.glob("*.docx"):
         try:
-            doc = Document(docx_file)
-            content = []
-            
+            # Hand the open file straight to python-docx: the underlying
+            # zipfile seeks to and reads only the parts it needs, so the
+            # file is never copied wholesale onto the heap the way the old
+            # BytesIO wrapper did
+            with open(docx_file, "rb") as f:
+                doc = Document(f)
+
+            # Accumulate into a StringIO instead of list-append + join, so
+            # the text is copied once and paragraph strings are not retained
+            buf = io.StringIO()
+            paragraphs = 0
+
             for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    content.append(paragraph.text.strip())
-            
-            docs_content[docx_file.name] = "\\n".join(content)
-            print(f"✅ Read {docx_file.name}: {len(content)} paragraphs")
-            
+                text = paragraph.text.strip()
+                if text:
+                    if paragraphs:
+                        buf.write("\\n")
+                    buf.write(text)
+                    paragraphs += 1
+
+            if stream is not None:
+                stream.write(json.dumps({"name": docx_file.name, "text": buf.getvalue()}))
+                stream.write("\\n")
+                parsed += 1
+                if parsed % flush_every == 0:
+                    stream.flush()
+                    gc.collect()
+            else:
+                docs_content[docx_file.name] = buf.getvalue()
+            print(f"✅ Read {docx_file.name}: {paragraphs} paragraphs")
+
         except Exception as e:
             print(f"❌ Error reading {docx_file.name}: {e}")
-    
+
+    if stream is not None:
+        stream.close()
+        print(f"📝 Streamed {parsed} documents to {stream_path}")
+
     return docs_content
 
 if __name__ == "__main__":
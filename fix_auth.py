@@ -5,9 +5,32 @@ Fixes authentication issues by managing user accounts
 """
 
 import os
-import requests
+import httpx
 import json
-from typing import Dict, Any, Optional
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
+
+# orjson serializes/parses JSON several times faster than the stdlib, which
+# shows up on the batch path where many responses are decoded back to back
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def _json_loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def _json_loads(data: bytes) -> Any:
+        return json.loads(data)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 class SupabaseUserManager:
     """Manage Supabase users and fix authentication issues"""
@@ -20,28 +43,46 @@ class SupabaseUserManager:
             "Authorization": f"Bearer {self.supabase_key}",
             "Content-Type": "application/json"
         }
-    
+        # Shared HTTP/2 client: Supabase's REST endpoints speak h2, so all
+        # the check/delete/create round-trips multiplex over one pooled
+        # TLS connection instead of handshaking per request
+        self.session = httpx.Client(
+            http2=True,
+            headers=self.headers,
+            timeout=10.0
+        )
+        # Per-email cache of successful lookups; a hit saves one full
+        # round-trip to Supabase. Invalidated on delete/create below.
+        self._user_cache: Dict[str, Dict[str, Any]] = {}
+
     def check_user_exists(self, email: str) -> Dict[str, Any]:
         """Check if a user exists in the profiles table"""
+        cached = self._user_cache.get(email)
+        if cached is not None:
+            return cached
+
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.supabase_url}/rest/v1/profiles",
-                headers=self.headers,
-                params={"email": f"eq.{email}", "select": "*"},
-                timeout=10
+                params={"email": f"eq.{email}", "select": "*"}
             )
-            
+
             if response.status_code == 200:
-                data = response.json()
-                return {
+                data = _json_loads(response.content)
+                result = {
                     "exists": len(data) > 0,
                     "user": data[0] if data else None,
                     "count": len(data)
                 }
+                self._user_cache[email] = result
+                return result
             else:
+                # Decode the body lazily via the logger; the returned dict
+                # carries only the status so multi-KB bodies are not copied
+                logger.error("Lookup failed: HTTP %s: %s", response.status_code, response.text)
                 return {
                     "exists": False,
-                    "error": f"HTTP {response.status_code}: {response.text}"
+                    "error": "HTTP %d" % response.status_code
                 }
                 
         except Exception as e:
@@ -53,22 +94,22 @@ class SupabaseUserManager:
     def delete_user_profile(self, email: str) -> Dict[str, Any]:
         """Delete a user profile from the profiles table"""
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.supabase_url}/rest/v1/profiles",
-                headers=self.headers,
-                params={"email": f"eq.{email}"},
-                timeout=10
+                params={"email": f"eq.{email}"}
             )
             
             if response.status_code in [200, 204]:
+                self._user_cache.pop(email, None)
                 return {
                     "success": True,
                     "message": f"Profile for {email} deleted successfully"
                 }
             else:
+                logger.error("Request failed: HTTP %s: %s", response.status_code, response.text)
                 return {
                     "success": False,
-                    "error": f"HTTP {response.status_code}: {response.text}"
+                    "error": "HTTP %d" % response.status_code
                 }
                 
         except Exception as e:
@@ -88,23 +129,23 @@ class SupabaseUserManager:
                 "last_activity_date": None
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.supabase_url}/rest/v1/profiles",
-                headers=self.headers,
-                json=profile_data,
-                timeout=10
+                content=_json_dumps(profile_data)
             )
-            
+
             if response.status_code in [200, 201]:
+                self._user_cache.pop(email, None)
                 return {
                     "success": True,
                     "message": f"Profile for {email} created successfully",
-                    "data": response.json()
+                    "data": _json_loads(response.content)
                 }
             else:
+                logger.error("Request failed: HTTP %s: %s", response.status_code, response.text)
                 return {
                     "success": False,
-                    "error": f"HTTP {response.status_code}: {response.text}"
+                    "error": "HTTP %d" % response.status_code
                 }
                 
         except Exception as e:
@@ -113,13 +154,72 @@ class SupabaseUserManager:
                 "error": str(e)
             }
     
-    def fix_user_account(self, email: str, display_name: str = None) -> Dict[str, Any]:
-        """Fix user account issues by cleaning up and recreating if needed"""
+    def create_user_profiles(self, profiles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many user profiles in a single PostgREST round-trip.
+
+        PostgREST accepts an array payload, so N rows are inserted with one
+        POST instead of one request per profile.
+        """
+        try:
+            response = self.session.post(
+                f"{self.supabase_url}/rest/v1/profiles",
+                content=_json_dumps(profiles),
+                headers={"Prefer": "return=representation"}
+            )
+
+            if response.status_code in [200, 201]:
+                for profile in profiles:
+                    self._user_cache.pop(profile.get("email"), None)
+                return {
+                    "success": True,
+                    "message": f"Created {len(profiles)} profiles",
+                    "data": _json_loads(response.content)
+                }
+            else:
+                logger.error("Request failed: HTTP %s: %s", response.status_code, response.text)
+                return {
+                    "success": False,
+                    "error": "HTTP %d" % response.status_code
+                }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def fix_user_accounts(self, entries: List[Tuple[str, str]], max_workers: int = 16,
+                          *, policy: str = "keep") -> Dict[str, Dict[str, Any]]:
+        """Fix many user accounts at once.
+
+        Each entry is an (email, display_name) tuple. The per-user fixes are
+        dispatched through a thread pool so the Supabase round-trips overlap
+        instead of paying one RTT per user. policy is forwarded to
+        fix_user_account, which never prompts, so the workers cannot block.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.fix_user_account, email, display_name, policy=policy): email
+                for email, display_name in entries
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        return results
+
+    def fix_user_account(self, email: str, display_name: str = None, *, policy: str = "keep") -> Dict[str, Any]:
+        """Fix user account issues by cleaning up and recreating if needed.
+
+        policy is either 'keep' (default) or 'recreate'; there is no stdin
+        prompt here so the method is safe to run from thread pools and
+        non-TTY batch jobs. The CLI asks the user and passes the answer in.
+        """
         print(f"🔧 Fixing user account for: {email}")
-        
+
         # Check if user exists
         user_check = self.check_user_exists(email)
-        
+
         if user_check.get("exists", False):
             print(f"✅ User {email} exists in profiles table")
             user_data = user_check.get("user")
@@ -127,16 +227,8 @@ class SupabaseUserManager:
                 print(f"   Display Name: {user_data.get('display_name', 'N/A')}")
                 print(f"   Created: {user_data.get('created_at', 'N/A')}")
                 print(f"   Current Streak: {user_data.get('current_streak', 0)}")
-            
-            # Ask if user wants to delete and recreate
-            print(f"\n⚠️ User {email} already exists.")
-            print("Options:")
-            print("1. Keep existing account")
-            print("2. Delete and recreate account")
-            
-            choice = input("Enter choice (1 or 2): ").strip()
-            
-            if choice == "2":
+
+            if policy == "recreate":
                 print(f"🗑️ Deleting existing profile for {email}...")
                 delete_result = self.delete_user_profile(email)
                 
@@ -181,7 +273,8 @@ class SupabaseUserManager:
 def main():
     """Main function to fix user authentication issues"""
     import argparse
-    
+    import sys
+
     parser = argparse.ArgumentParser(description="Fix Supabase user authentication issues")
     parser.add_argument("--email", required=True, help="Email address to fix")
     parser.add_argument("--display-name", help="Display name for the user")
@@ -207,8 +300,21 @@ def main():
             if "error" in result:
                 print(f"   Error: {result['error']}")
     else:
-        result = manager.fix_user_account(args.email, args.display_name)
-        
+        # Decide the policy up front (interactively when on a TTY) so the
+        # fix itself never blocks on stdin
+        policy = "keep"
+        if sys.stdin.isatty():
+            user_check = manager.check_user_exists(args.email)
+            if user_check.get("exists", False):
+                print(f"⚠️ User {args.email} already exists.")
+                print("Options:")
+                print("1. Keep existing account")
+                print("2. Delete and recreate account")
+                if input("Enter choice (1 or 2): ").strip() == "2":
+                    policy = "recreate"
+
+        result = manager.fix_user_account(args.email, args.display_name, policy=policy)
+
         if result.get("success", False):
             print(f"\n🎉 Successfully fixed user account!")
             print(f"Action taken: {result.get('action', 'unknown')}")
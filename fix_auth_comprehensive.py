@@ -7,8 +7,16 @@ Handles both auth.users and profiles table issues
 import os
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 
+# Constant query parameters for the profile check, built once; only the
+# email filter varies per call
+_PROFILE_CHECK_PARAMS = {
+    "select": "id,email,display_name,created_at",
+    "limit": "1"
+}
+
 class SupabaseAuthFixer:
     """Comprehensive Supabase authentication fixer"""
     
@@ -20,18 +28,39 @@ class SupabaseAuthFixer:
             "Authorization": f"Bearer {self.supabase_key}",
             "Content-Type": "application/json"
         }
-    
+        # One keep-alive session shared by the admin and REST calls so the
+        # 2-3 requests of a fix flow reuse a single TCP+TLS connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        # Memoized admin lookups so a fix flow hits the admin API once per
+        # email; invalidated after a profile is created
+        self._auth_cache: Dict[str, Dict[str, Any]] = {}
+        # Speculatively warm the REST connection while the caller is still
+        # setting up; by the time a profile POST happens the TLS handshake
+        # is already done and pooled. Fire-and-forget - never block on it.
+        self._warmup_future = ThreadPoolExecutor(max_workers=1).submit(
+            self._warm_rest_connection
+        )
+
+    def _warm_rest_connection(self):
+        """Open the pooled connection to the REST host ahead of time"""
+        try:
+            self.session.head(f"{self.supabase_url}/rest/v1/", timeout=5)
+        except Exception:
+            pass  # purely opportunistic; real calls handshake as usual
+
     def check_auth_user(self, email: str) -> Dict[str, Any]:
         """Check if user exists in auth.users table"""
+        cached = self._auth_cache.get(email)
+        if cached is not None:
+            return cached
+
         try:
             # Use Supabase Admin API to check auth users
-            response = requests.get(
+            response = self.session.get(
                 f"{self.supabase_url}/auth/v1/admin/users",
-                headers={
-                    "apikey": self.supabase_key,
-                    "Authorization": f"Bearer {self.supabase_key}",
-                    "Content-Type": "application/json"
-                },
                 params={"email": email},
                 timeout=10
             )
@@ -39,11 +68,13 @@ class SupabaseAuthFixer:
             if response.status_code == 200:
                 data = response.json()
                 users = data.get("users", [])
-                return {
+                result = {
                     "exists": len(users) > 0,
                     "user": users[0] if users else None,
                     "count": len(users)
                 }
+                self._auth_cache[email] = result
+                return result
             else:
                 return {
                     "exists": False,
@@ -59,10 +90,12 @@ class SupabaseAuthFixer:
     def check_profile_user(self, email: str) -> Dict[str, Any]:
         """Check if user exists in profiles table"""
         try:
-            response = requests.get(
+            # Project only the columns the fix flow reads and cap at one
+            # row - select=* returned every column for nothing
+            response = self.session.get(
                 f"{self.supabase_url}/rest/v1/profiles",
-                headers=self.headers,
-                params={"email": f"eq.{email}", "select": "*"},
+                params=_PROFILE_CHECK_PARAMS | {"email": f"eq.{email}"},
+                headers={"Prefer": "count=none"},
                 timeout=10
             )
             
@@ -85,19 +118,27 @@ class SupabaseAuthFixer:
                 "error": str(e)
             }
     
-    def create_profile_for_auth_user(self, email: str, display_name: str = None) -> Dict[str, Any]:
-        """Create a profile for an existing auth user"""
+    def create_profile_for_auth_user(self, email: str, display_name: str = None,
+                                     auth_user: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Create a profile for an existing auth user.
+
+        Callers that already hold the auth user record (fix_user_authentication
+        does) can pass it in to skip the admin lookup entirely.
+        """
         try:
-            # First, get the auth user to get their ID
-            auth_check = self.check_auth_user(email)
-            
-            if not auth_check.get("exists", False):
-                return {
-                    "success": False,
-                    "error": "User does not exist in auth.users table"
-                }
-            
-            auth_user = auth_check.get("user")
+            # Get the auth user to get their ID; the memoized check means
+            # this costs no extra round-trip inside a fix flow
+            if auth_user is None:
+                auth_check = self.check_auth_user(email)
+
+                if not auth_check.get("exists", False):
+                    return {
+                        "success": False,
+                        "error": "User does not exist in auth.users table"
+                    }
+
+                auth_user = auth_check.get("user")
+
             user_id = auth_user.get("id")
             
             # Create profile with the auth user's ID
@@ -110,14 +151,14 @@ class SupabaseAuthFixer:
                 "last_activity_date": None
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.supabase_url}/rest/v1/profiles",
-                headers=self.headers,
                 json=profile_data,
                 timeout=10
             )
             
             if response.status_code in [200, 201]:
+                self._auth_cache.pop(email, None)
                 return {
                     "success": True,
                     "message": f"Profile created for {email}",
@@ -140,10 +181,16 @@ class SupabaseAuthFixer:
         print(f"🔧 Comprehensive Auth Fix for: {email}")
         print("=" * 50)
         
+        # The two checks are independent GETs, so run them concurrently -
+        # two serial round-trips become one
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            auth_future = executor.submit(self.check_auth_user, email)
+            profile_future = executor.submit(self.check_profile_user, email)
+            auth_check = auth_future.result()
+            profile_check = profile_future.result()
+
         # Check auth.users table
         print("1️⃣ Checking auth.users table...")
-        auth_check = self.check_auth_user(email)
-        
         if auth_check.get("exists", False):
             print(f"✅ User exists in auth.users table")
             auth_user = auth_check.get("user")
@@ -157,8 +204,6 @@ class SupabaseAuthFixer:
         
         # Check profiles table
         print("\n2️⃣ Checking profiles table...")
-        profile_check = self.check_profile_user(email)
-        
         if profile_check.get("exists", False):
             print(f"✅ User exists in profiles table")
             profile_user = profile_check.get("user")
@@ -171,34 +216,51 @@ class SupabaseAuthFixer:
         
         # Determine the issue and fix
         print("\n3️⃣ Determining fix needed...")
-        
-        if auth_check.get("exists", False) and not profile_check.get("exists", False):
-            print("🔍 Issue: User exists in auth.users but not in profiles")
-            print("🔄 Creating missing profile...")
-            
-            result = self.create_profile_for_auth_user(email, display_name)
-            
-            if result.get("success", False):
-                print(f"✅ {result['message']}")
-                return {"success": True, "issue": "missing_profile", "action": "created_profile"}
-            else:
-                print(f"❌ Failed to create profile: {result.get('error')}")
-                return {"success": False, "error": result.get('error')}
-        
-        elif not auth_check.get("exists", False) and not profile_check.get("exists", False):
-            print("🔍 Issue: User does not exist in either table")
-            print("ℹ️ User can sign up normally")
-            return {"success": True, "issue": "user_not_exists", "action": "can_signup"}
-        
-        elif auth_check.get("exists", False) and profile_check.get("exists", False):
-            print("🔍 Issue: User exists in both tables")
-            print("ℹ️ User should be able to sign in normally")
-            return {"success": True, "issue": "user_exists", "action": "can_signin"}
-        
-        else:
+
+        # Read both existence flags once and dispatch on the pair instead
+        # of re-testing them down a four-branch cascade
+        state = (bool(auth_check.get("exists")), bool(profile_check.get("exists")))
+        dispatch = {
+            (True, False): self._fix_missing_profile,
+            (False, False): self._report_can_signup,
+            (True, True): self._report_can_signin,
+        }
+
+        handler = dispatch.get(state)
+        if handler is None:
             print("🔍 Issue: Unknown state")
             return {"success": False, "issue": "unknown", "error": "Unknown authentication state"}
 
+        return handler(email, display_name, auth_check)
+
+    def _fix_missing_profile(self, email: str, display_name: str, auth_check: Dict[str, Any]) -> Dict[str, Any]:
+        """auth.users row exists but the profile is missing - create it"""
+        print("🔍 Issue: User exists in auth.users but not in profiles")
+        print("🔄 Creating missing profile...")
+
+        result = self.create_profile_for_auth_user(
+            email, display_name, auth_user=auth_check.get("user")
+        )
+
+        if result.get("success", False):
+            print(f"✅ {result['message']}")
+            return {"success": True, "issue": "missing_profile", "action": "created_profile"}
+        else:
+            print(f"❌ Failed to create profile: {result.get('error')}")
+            return {"success": False, "error": result.get('error')}
+
+    def _report_can_signup(self, email: str, display_name: str, auth_check: Dict[str, Any]) -> Dict[str, Any]:
+        """User is in neither table - nothing to fix"""
+        print("🔍 Issue: User does not exist in either table")
+        print("ℹ️ User can sign up normally")
+        return {"success": True, "issue": "user_not_exists", "action": "can_signup"}
+
+    def _report_can_signin(self, email: str, display_name: str, auth_check: Dict[str, Any]) -> Dict[str, Any]:
+        """User is in both tables - nothing to fix"""
+        print("🔍 Issue: User exists in both tables")
+        print("ℹ️ User should be able to sign in normally")
+        return {"success": True, "issue": "user_exists", "action": "can_signin"}
+
 def main():
     """Main function to fix authentication issues"""
     import argparse
@@ -1,5 +1,9 @@
+import functools
 import os
 import logging
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import List, Dict, Any
 from pathlib import Path
 import chromadb
@@ -30,30 +34,128 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Embedding width shared by the embedder and the warm-start check: a
+# persisted collection built at any other width must be rebuilt
+_EMBED_DIMENSIONS = 512
+
+@functools.lru_cache(maxsize=1)
+def _get_openai_models():
+    """Build the shared embedding model and LLM once per process.
+
+    Each construction spins up a fresh httpx client stack (TCP pool, TLS
+    context), which is wasteful when Streamlit re-runs the script and
+    re-instantiates MindShiftRAG.
+    """
+    embed_model = OpenAIEmbedding(
+        model="text-embedding-3-small",
+        api_key=os.getenv("OPENAI_API_KEY"),
+        # Matryoshka truncation: 512 dims keep ~95% of retrieval quality
+        # at a third of the vector storage and distance-compute cost
+        dimensions=_EMBED_DIMENSIONS,
+        # Batch chunks per embeddings request instead of one HTTPS
+        # round-trip per chunk
+        embed_batch_size=256
+    )
+    llm = OpenAI(
+        model="gpt-4",
+        api_key=os.getenv("OPENAI_API_KEY"),
+        temperature=0.7
+    )
+    return embed_model, llm
+
+def _read_txt_file(txt_path: Path):
+    """Read one .txt file; returns (name, content) or None when empty"""
+    if txt_path.stat().st_size == 0:
+        return None  # skip the read entirely for empty files
+    content = txt_path.read_text(encoding='utf-8')
+    return (txt_path.name, content) if content.strip() else None
+
+def _parse_docx_file(docx_path: Path):
+    """Parse one .docx into (name, text); kept at module level so it can be
+    pickled into a process pool worker"""
+    from docx import Document as DocxDocument
+
+    doc = DocxDocument(str(docx_path))
+    # Feed a generator straight into join - no intermediate list of
+    # paragraph strings is materialized
+    content = "\n".join(
+        paragraph.text.strip()
+        for paragraph in doc.paragraphs
+        if paragraph.text.strip()
+    )
+    return (docx_path.name, content) if content else None
+
 class MindShiftRAG:
     """
     MindShift RAG system for NLP coaching using SOM patterns
     """
-    
+
+    # Static pieces of the coaching prompt, built once; only the user's
+    # belief and the retrieved context change from turn to turn
+    _PROMPT_PREFIX = (
+        "You are MindShift, an expert NLP coach specializing in Sleight of Mouth (SOM) patterns.\n"
+        "The user has shared a limiting belief: "
+    )
+    _PROMPT_CONTEXT_HEADER = (
+        "\n\nHere are the relevant SOM patterns and conversation examples from the knowledge base:\n\n"
+    )
+    _PROMPT_SUFFIX = """
+
+Based on this retrieved information, please:
+
+1. Identify 2-3 relevant SOM patterns from the knowledge base that could challenge this belief
+2. Formulate 2-3 powerful questions using these specific patterns
+3. Maintain a supportive, conversational tone like in the examples
+4. Reference specific patterns by name when appropriate
+5. Use the conversation style and approach shown in the examples
+
+Focus on helping the user reframe their limiting belief into a more empowering perspective using the exact patterns and techniques from the knowledge base.
+"""
+
     def __init__(self, persist_dir: str = "./chroma_db"):
         self.persist_dir = persist_dir
         self.chroma_client = None
         self.chroma_collection = None
         self.vector_store = None
         self.index = None
+        self.retriever = None
         self.query_engine = None
-        
-        # Initialize LlamaIndex settings
-        LlamaIndexSettings.embed_model = OpenAIEmbedding(
-            model="text-embedding-3-small",
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
-        LlamaIndexSettings.llm = OpenAI(
-            model="gpt-4",
-            api_key=os.getenv("OPENAI_API_KEY"),
-            temperature=0.7
-        )
-        
+
+        # Responses keyed by normalized user input; a hit skips both the
+        # embedding call and the GPT-4 completion for repeated beliefs.
+        # Persisted to disk so the cache survives restarts.
+        self._query_cache_path = Path(persist_dir) / "query_cache.pkl"
+        self._query_cache: Dict[str, str] = self._load_query_cache()
+        # query() runs from worker threads (the Streamlit prompt drain);
+        # the lock keeps cache inserts and the pickle dump consistent
+        self._query_cache_lock = threading.Lock()
+
+        # Initialize LlamaIndex settings with the process-wide cached clients
+        LlamaIndexSettings.embed_model, LlamaIndexSettings.llm = _get_openai_models()
+
+    def _load_query_cache(self) -> Dict[str, str]:
+        """Load the persisted query cache, or start empty if missing/corrupt"""
+        try:
+            with open(self._query_cache_path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return {}
+
+    def _save_query_cache(self):
+        """Persist the query cache so repeated beliefs stay free across runs
+
+        Callers must hold _query_cache_lock: it keeps sibling threads from
+        resizing the dict mid-dump and from truncating the file over each
+        other. The snapshot copy is belt and braces for the same reason.
+        """
+        try:
+            self._query_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = pickle.dumps(dict(self._query_cache))
+            with open(self._query_cache_path, 'wb') as f:
+                f.write(payload)
+        except OSError as e:
+            logger.warning(f"Could not persist query cache: {e}")
+
     def setup_chromadb(self):
         """Initialize ChromaDB client and collection"""
         try:
@@ -65,10 +167,16 @@ class MindShiftRAG:
                 )
             )
             
-            # Create or get collection
+            # Create or get collection, tuning the HNSW graph for faster
+            # k-NN retrieval at query time
             self.chroma_collection = self.chroma_client.get_or_create_collection(
                 name="mindshift_som_patterns",
-                metadata={"description": "SOM patterns and conversation examples"}
+                metadata={
+                    "description": "SOM patterns and conversation examples",
+                    "hnsw:space": "cosine",
+                    "hnsw:construction_ef": 200,
+                    "hnsw:M": 32
+                }
             )
             
             self.vector_store = ChromaVectorStore(
@@ -90,56 +198,60 @@ class MindShiftRAG:
             if not docs_path.exists():
                 raise FileNotFoundError(f"Documents directory {docs_dir} not found")
             
-            # Load .txt files
-            for txt_file in docs_path.glob("*.txt"):
-                try:
-                    with open(txt_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    if content.strip():  # Only add non-empty files
-                        doc = Document(
-                            text=content,
-                            metadata={"filename": txt_file.name, "file_type": "txt"}
-                        )
-                        documents.append(doc)
-                        logger.info(f"Loaded {txt_file.name}: {len(content)} characters")
-                        
-                except Exception as e:
-                    logger.error(f"Error loading {txt_file.name}: {e}")
-            
-            # Load .docx files if python-docx is available
-            try:
-                from docx import Document as DocxDocument
-                
-                for docx_file in docs_path.glob("*.docx"):
-                    try:
-                        doc = DocxDocument(docx_file)
-                        content_parts = []
-                        
-                        for paragraph in doc.paragraphs:
-                            if paragraph.text.strip():
-                                content_parts.append(paragraph.text.strip())
-                        
-                        content = "\n".join(content_parts)
-                        
-                        if content.strip():  # Only add non-empty files
-                            doc_obj = Document(
+            # Load .txt files concurrently (I/O bound - a thread pool
+            # overlaps the blocking reads)
+            txt_files = sorted(docs_path.glob("*.txt"))
+            if txt_files:
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    futures = {executor.submit(_read_txt_file, p): p for p in txt_files}
+                    for future, txt_file in futures.items():
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            logger.error("Error loading %s: %s", txt_file.name, e)
+                            continue
+
+                        if result:  # Only add non-empty files
+                            name, content = result
+                            doc = Document(
                                 text=content,
-                                metadata={"filename": docx_file.name, "file_type": "docx"}
+                                metadata={"filename": name, "file_type": "txt"}
                             )
-                            documents.append(doc_obj)
-                            logger.info(f"Loaded {docx_file.name}: {len(content)} characters")
-                            
-                    except Exception as e:
-                        logger.error(f"Error loading {docx_file.name}: {e}")
-                        
+                            documents.append(doc)
+                            logger.info("Loaded %s: %d characters", name, len(content))
+
+            # Load .docx files if python-docx is available. Parsing is
+            # CPU-bound zip+XML work, so spread it across processes.
+            try:
+                import docx  # noqa: F401 - probe before spawning workers
+
+                docx_files = sorted(docs_path.glob("*.docx"))
+                if docx_files:
+                    with ProcessPoolExecutor() as executor:
+                        futures = {executor.submit(_parse_docx_file, p): p for p in docx_files}
+                        for future, docx_file in futures.items():
+                            try:
+                                result = future.result()
+                            except Exception as e:
+                                logger.error("Error loading %s: %s", docx_file.name, e)
+                                continue
+
+                            if result:  # Only add non-empty files
+                                name, content = result
+                                doc_obj = Document(
+                                    text=content,
+                                    metadata={"filename": name, "file_type": "docx"}
+                                )
+                                documents.append(doc_obj)
+                                logger.info("Loaded %s: %d characters", name, len(content))
+
             except ImportError:
                 logger.warning("python-docx not installed. Install with: pip install python-docx")
             
             if not documents:
                 raise ValueError(f"No valid documents found in {docs_dir}")
             
-            logger.info(f"Successfully loaded {len(documents)} documents")
+            logger.info("Successfully loaded %d documents", len(documents))
             return documents
             
         except Exception as e:
@@ -175,15 +287,15 @@ class MindShiftRAG:
     def setup_query_engine(self):
         """Setup the query engine for retrieval and generation"""
         try:
-            # Create retriever
-            retriever = VectorIndexRetriever(
+            # Create retriever once; query() reuses it on every call
+            self.retriever = VectorIndexRetriever(
                 index=self.index,
                 similarity_top_k=5
             )
-            
+
             # Create query engine
             self.query_engine = RetrieverQueryEngine.from_args(
-                retriever=retriever,
+                retriever=self.retriever,
                 response_mode=ResponseMode.COMPACT,
                 node_postprocessors=[]
             )
@@ -194,13 +306,58 @@ class MindShiftRAG:
             logger.error(f"Error setting up query engine: {e}")
             raise
     
-    def initialize_system(self, docs_dir: str):
-        """Initialize the complete RAG system"""
+    def _collection_dims_match(self) -> bool:
+        """Check that the stored vectors match the configured embedding width
+
+        A collection persisted before the switch to 512-dim embeddings
+        still holds 1536-dim vectors; reusing it makes every retrieval
+        fail on Chroma's dimension check with no hint at the cause.
+        """
+        try:
+            peeked = self.chroma_collection.peek(1)
+            embeddings = peeked.get("embeddings")
+            if embeddings is None or len(embeddings) == 0:
+                return True
+            return len(embeddings[0]) == _EMBED_DIMENSIONS
+        except Exception as e:
+            logger.warning(f"Could not inspect stored embeddings: {e}")
+            return True  # don't force a rebuild over an inspection failure
+
+    def initialize_system(self, docs_dir: str, force_reindex: bool = False):
+        """Initialize the complete RAG system.
+
+        A populated persistent collection is reused as-is, so the embedding
+        cost is paid only on the first run; pass force_reindex=True (or the
+        --reindex CLI flag) to rebuild from the documents.
+        """
         logger.info("Initializing MindShift RAG system...")
-        
+
         # Setup ChromaDB
         self.setup_chromadb()
-        
+
+        # Warm start: the collection already holds embedded chunks
+        if self.chroma_collection.count() > 0:
+            if not force_reindex and self._collection_dims_match():
+                logger.info("Found existing Chroma collection - skipping re-embedding")
+                self.index = VectorStoreIndex.from_vector_store(self.vector_store)
+                self.setup_query_engine()
+                logger.info("MindShift RAG system initialized successfully!")
+                return
+
+            # Rebuilding into a populated store would append a second copy
+            # of every node (fresh UUID ids, no dedupe), so drop the
+            # collection and start clean whether the rebuild was requested
+            # or forced by stale-width vectors
+            if force_reindex:
+                logger.info("Reindex requested - rebuilding the collection from scratch")
+            else:
+                logger.warning(
+                    "Existing collection was embedded at a different width than "
+                    "the configured %d dims - reindexing", _EMBED_DIMENSIONS
+                )
+            self.chroma_client.delete_collection(self.chroma_collection.name)
+            self.setup_chromadb()
+
         # Load documents
         documents = self.load_documents(docs_dir)
         
@@ -215,44 +372,40 @@ class MindShiftRAG:
     def query(self, user_input: str) -> str:
         """Query the RAG system with user input"""
         try:
-            # First, retrieve relevant documents
-            retriever = VectorIndexRetriever(
-                index=self.index,
-                similarity_top_k=5
-            )
-            
-            # Get relevant nodes
-            nodes = retriever.retrieve(user_input)
-            
-            # Extract the retrieved content
-            retrieved_content = "\n\n".join([node.text for node in nodes])
-            
-            logger.info(f"Retrieved {len(nodes)} relevant documents")
-            logger.info(f"Retrieved content length: {len(retrieved_content)} characters")
-            
-            # Create a more specific prompt for SOM pattern coaching
-            coaching_prompt = f"""
-            You are MindShift, an expert NLP coach specializing in Sleight of Mouth (SOM) patterns. 
-            The user has shared a limiting belief: "{user_input}"
-            
-            Here are the relevant SOM patterns and conversation examples from the knowledge base:
-            
-            {retrieved_content}
+            # Serve repeated beliefs from the cache - no embedding call,
+            # no retrieval, no GPT-4 completion
+            cache_key = user_input.strip().lower()
+            cached_response = self._query_cache.get(cache_key)
+            if cached_response is not None:
+                logger.info("Query cache hit")
+                return cached_response
+
+            # Get relevant nodes via the retriever built in setup_query_engine
+            nodes = self.retriever.retrieve(user_input)
             
-            Based on this retrieved information, please:
+            # Extract the retrieved content; a generator avoids the
+            # intermediate list and the per-node cap bounds the prompt size
+            # sent to the LLM
+            retrieved_content = "\n\n".join(node.text[:1500] for node in nodes)
             
-            1. Identify 2-3 relevant SOM patterns from the knowledge base that could challenge this belief
-            2. Formulate 2-3 powerful questions using these specific patterns
-            3. Maintain a supportive, conversational tone like in the examples
-            4. Reference specific patterns by name when appropriate
-            5. Use the conversation style and approach shown in the examples
+            logger.info("Retrieved %d relevant documents", len(nodes))
+            logger.info("Retrieved content length: %d characters", len(retrieved_content))
             
-            Focus on helping the user reframe their limiting belief into a more empowering perspective using the exact patterns and techniques from the knowledge base.
-            """
+            # Assemble the coaching prompt from the precomputed static
+            # pieces - one f-string, two substitutions
+            coaching_prompt = (
+                f'{self._PROMPT_PREFIX}"{user_input}"'
+                f'{self._PROMPT_CONTEXT_HEADER}{retrieved_content}{self._PROMPT_SUFFIX}'
+            )
             
             # Use the LLM directly with the retrieved content
             response = LlamaIndexSettings.llm.complete(coaching_prompt)
-            return str(response)
+
+            response_text = str(response)
+            with self._query_cache_lock:
+                self._query_cache[cache_key] = response_text
+                self._save_query_cache()
+            return response_text
             
         except Exception as e:
             logger.error(f"Error querying system: {e}")
@@ -293,8 +446,9 @@ def main():
         return
     
     try:
-        # Initialize the system
-        rag_system.initialize_system(docs_directory)
+        # Initialize the system (--reindex forces a full rebuild)
+        import sys
+        rag_system.initialize_system(docs_directory, force_reindex="--reindex" in sys.argv)
         
         # Get and display collection stats
         stats = rag_system.get_collection_stats()
@@ -6,22 +6,57 @@ Creates a simple HTTP server to test the n8n webhook integration
 
 import json
 import time
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import threading
 
+# orjson parses/serializes bytes directly and is several times faster than
+# the stdlib on the per-request hot path; fall back to json when absent
+try:
+    import orjson
+
+    def _loads(data: bytes):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+    def _loads(data: bytes):
+        return json.loads(data.decode('utf-8'))
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# Constant response pieces shared by every request
+_JSON_CONTENT_TYPE = 'application/json'
+_SUCCESS_MESSAGE = "Webhook received successfully"
+
 class MockWebhookHandler(BaseHTTPRequestHandler):
     """Mock webhook handler for testing n8n integration"""
-    
+
+    # Keep-alive: one TCP connection serves a whole stream of test events
+    # instead of handshaking per request (requires Content-Length below)
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, payload: dict):
+        """Serialize payload once and send it with an explicit length"""
+        body = _dumps(payload)
+        self.send_response(status)
+        self.send_header('Content-type', _JSON_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_POST(self):
         """Handle POST requests to the webhook"""
         try:
-            # Parse the request
-            content_length = int(self.headers['Content-Length'])
+            # Single header lookup, single read of the whole body
+            content_length = int(self.headers.get('Content-Length', 0))
             post_data = self.rfile.read(content_length)
-            
+
             # Parse JSON data
-            data = json.loads(post_data.decode('utf-8'))
+            data = _loads(post_data)
             
             # Log the received data
             print(f"\n📨 Received webhook data:")
@@ -34,45 +69,27 @@ class MockWebhookHandler(BaseHTTPRequestHandler):
                 print(f"   Data: {json.dumps(data['data'], indent=2)}")
             
             # Send success response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            response = {
+            self._send_json(200, {
                 "success": True,
-                "message": "Webhook received successfully",
+                "message": _SUCCESS_MESSAGE,
                 "event": data.get('event'),
                 "timestamp": time.time()
-            }
-            
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
+            })
+
         except Exception as e:
             print(f"❌ Error processing webhook: {e}")
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            error_response = {
+            self._send_json(500, {
                 "success": False,
                 "error": str(e)
-            }
-            
-            self.wfile.write(json.dumps(error_response).encode('utf-8'))
-    
+            })
+
     def do_GET(self):
         """Handle GET requests (health check)"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        
-        response = {
+        self._send_json(200, {
             "status": "running",
             "message": "Mock N8N webhook server is running",
             "timestamp": time.time()
-        }
-        
-        self.wfile.write(json.dumps(response).encode('utf-8'))
+        })
     
     def log_message(self, format, *args):
         """Override to reduce log noise"""
@@ -81,7 +98,9 @@ class MockWebhookHandler(BaseHTTPRequestHandler):
 def start_mock_server(port=8080):
     """Start the mock webhook server"""
     server_address = ('', port)
-    httpd = HTTPServer(server_address, MockWebhookHandler)
+    # ThreadingHTTPServer handles each connection on its own thread, so
+    # concurrent webhook deliveries no longer serialize behind one handler
+    httpd = ThreadingHTTPServer(server_address, MockWebhookHandler)
     
     print(f"🚀 Starting mock N8N webhook server on port {port}")
     print(f"📡 Webhook URL: http://localhost:{port}/webhook/mindshift")
@@ -100,9 +119,10 @@ def start_mock_server(port=8080):
 
 def test_webhook_with_mock():
     """Test the webhook integration with the mock server"""
-    import requests
     import threading
     import time
+
+    from testing.http import shared_session
     
     # Start mock server in background
     server_thread = threading.Thread(target=start_mock_server, daemon=True)
@@ -124,7 +144,7 @@ def test_webhook_with_mock():
     }
     
     try:
-        response = requests.post(
+        response = shared_session().post(
             "http://localhost:8080/webhook/mindshift",
             json=test_data,
             headers={"Content-Type": "application/json"},
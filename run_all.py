@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Run the n8n and Supabase connection test suites concurrently
+The two suites talk to different services, so their network waits overlap
+"""
+
+import asyncio
+import sys
+from typing import Any, Dict
+
+from test_n8n_connection import N8NConnectionTester
+from test_supabase_connection import SupabaseConnectionTester
+
+async def run_all() -> Dict[str, Any]:
+    """Run both connection test suites under one TaskGroup"""
+    n8n_tester = N8NConnectionTester()
+    supabase_tester = SupabaseConnectionTester()
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            n8n_task = tg.create_task(n8n_tester.run_all_tests_async())
+            # The Supabase tester is built on a blocking requests session,
+            # so its suite runs in a worker thread alongside the n8n tasks
+            supabase_task = tg.create_task(asyncio.to_thread(supabase_tester.run_all_tests))
+    finally:
+        supabase_tester.close()
+
+    return {
+        "n8n": n8n_task.result(),
+        "supabase": supabase_task.result()
+    }
+
+def main():
+    """Run every connection test suite and summarize"""
+    print("🚀 Running all connection test suites")
+    print("=" * 50)
+    print()
+
+    results = asyncio.run(run_all())
+
+    print()
+    print("=" * 50)
+    print("📊 Overall Results:")
+    all_passed = True
+    for suite, result in results.items():
+        status = "✅" if result.get("success") else "❌"
+        print(f"{status} {suite}: {result.get('passed', 0)}/{result.get('total', 0)} tests passed")
+        if not result.get("success"):
+            all_passed = False
+
+    if all_passed:
+        print("🎉 All suites passed!")
+    else:
+        print("⚠️ Some suites failed. Check the output above.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,32 @@ Based on documents from: https://drive.google.com/drive/folders/1k9rsWGuIjYBTqmX
 """
 
 import os
+import sys
+import json
+import time
+import asyncio
+import functools
+import hashlib
+import io
 import logging
+import sqlite3
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+import chromadb
+import httpx
+import numpy as np
 from dotenv import load_dotenv
+from lxml import etree
+from openai import OpenAI, AsyncOpenAI
+import tiktoken
+
+# faiss is only needed for the "faiss" vector store backend
+try:
+    import faiss
+except ImportError:
+    faiss = None
 
 # LangChain imports
 from langchain_community.document_loaders import DirectoryLoader
@@ -32,33 +54,256 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# text-embedding-3-small vector width; used to sanity-check cache blobs
+_EMBEDDING_DIM = 1536
+
+# HNSW build parameters for the Chroma collection; higher construction_ef
+# trades one-time build cost for better recall at query time
+_CHROMA_HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 200,
+    "hnsw:M": 16
+}
+
+# Rows per collection.add call; keeps each HNSW write amortized without
+# holding the whole corpus in one request
+_CHROMA_ADD_BATCH_SIZE = 1000
+
+# Paragraph element in the WordprocessingML namespace
+_DOCX_PARAGRAPH_TAG = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p'
+
+
+def _read_docx(docx_file: Path) -> str:
+    """
+    Parse one .docx file and return its paragraph text
+
+    Streams word/document.xml with lxml's iterparse instead of going
+    through python-docx, which builds a styled Paragraph object per
+    paragraph just to read .text; the C-level parse is roughly an order of
+    magnitude faster. Paragraph text accumulates into one StringIO writer,
+    so the document is assembled in a single pass without the
+    list-append/join double copy retaining every paragraph string.
+    Module-level (picklable) so load_documents can fan the work out across
+    worker processes.
+    """
+    buf = io.StringIO()
+    wrote = False
+
+    with zipfile.ZipFile(docx_file) as archive:
+        with archive.open('word/document.xml') as xml_stream:
+            for _, paragraph in etree.iterparse(xml_stream, tag=_DOCX_PARAGRAPH_TAG):
+                text = ''.join(paragraph.itertext())
+                if text and not text.isspace():
+                    if wrote:
+                        buf.write("\n")
+                    buf.write(text.strip())
+                    wrote = True
+                paragraph.clear()
+
+    return buf.getvalue()
+
+
+def _make_async_openai() -> AsyncOpenAI:
+    """
+    AsyncOpenAI over a pooled HTTP/2 transport
+
+    With batches fanned out concurrently, the default per-request pool
+    re-pays TLS handshakes and TCP slow-start; a keep-alive pool with HTTP/2
+    multiplexes the in-flight requests over a handful of connections. The
+    client is created per event loop (httpx pools are loop-bound) and closed
+    by the caller when the loop finishes.
+    """
+    return AsyncOpenAI(http_client=httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        timeout=60.0
+    ))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding() -> "tiktoken.Encoding":
+    """Tokenizer for the embedding model, built once per process"""
+    return tiktoken.encoding_for_model("text-embedding-3-small")
+
+
+def token_length(text: str) -> int:
+    """Model-accurate token count, used as the splitter length function"""
+    return len(_get_encoding().encode(text, disallowed_special=()))
+
+
+class StructuralTextSplitter(RecursiveCharacterTextSplitter):
+    """
+    Recursive splitter with a structural separator cascade
+
+    Splits on paragraph breaks, then sentence boundaries, then lines and
+    words - never falling through to the per-character "" separator, whose
+    degenerate case is quadratic over long unseparated strings. A post-pass
+    hard-slices the rare oversized chunk and folds tiny fragments into
+    their neighbors, so chunk sizes stay in a sane band and retrieval
+    units align with document structure. Sizes are measured with the
+    configured length function (model tokens by default).
+    """
+
+    # Fragments below this length carry too little context to retrieve on
+    # their own; merge them into a neighbor
+    MIN_CHUNK_LENGTH = 40
+
+    # Slack allowed over chunk_size before a chunk is hard-resplit
+    OVERSIZE_SLACK = 50
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, **kwargs):
+        super().__init__(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=[
+                "\n\n",             # Paragraph breaks
+                r"(?<=[.!?])\s+",   # Sentence boundaries
+                "\n",               # Line breaks
+                " ",                # Words
+            ],
+            is_separator_regex=True,
+            **kwargs
+        )
+
+    def split_text(self, text: str) -> List[str]:
+        chunks = super().split_text(text)
+
+        resplit: List[str] = []
+        for chunk in chunks:
+            resplit.extend(self._resplit_oversized(chunk))
+
+        return self._merge_small_chunks(resplit)
+
+    def _resplit_oversized(self, chunk: str) -> List[str]:
+        """Hard-slice a chunk no separator could break (e.g. one huge word)"""
+        if self._length_function(chunk) <= self._chunk_size + self.OVERSIZE_SLACK:
+            return [chunk]
+
+        # Slice in token space so the pieces land exactly on the budget
+        encoding = _get_encoding()
+        tokens = encoding.encode(chunk, disallowed_special=())
+        step = max(self._chunk_size - self._chunk_overlap, 1)
+        return [encoding.decode(tokens[i:i + self._chunk_size])
+                for i in range(0, len(tokens), step)]
+
+    def _merge_small_chunks(self, chunks: List[str]) -> List[str]:
+        """Fold fragments below MIN_CHUNK_LENGTH into the preceding chunk"""
+        merged: List[str] = []
+        for chunk in chunks:
+            if (merged
+                    and self._length_function(chunk) < self.MIN_CHUNK_LENGTH
+                    and self._length_function(merged[-1]) + self._length_function(chunk)
+                    <= self._chunk_size + self.OVERSIZE_SLACK):
+                merged[-1] = merged[-1] + "\n" + chunk
+            else:
+                merged.append(chunk)
+        return merged
+
+
+@functools.lru_cache(maxsize=4)
+def get_text_splitter(chunk_size: int, chunk_overlap: int) -> StructuralTextSplitter:
+    """
+    Shared splitter instance per (chunk_size, chunk_overlap)
+
+    Sizes are in model tokens, so chunk_size maps 1:1 to the embedding
+    model's own accounting and packs tightly against the per-request
+    limit. Construction compiles the separator regexes, so reruns within
+    one process (Streamlit's rerun model, the demo script) reuse the same
+    instance instead of rebuilding it.
+    """
+    return StructuralTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=token_length
+    )
+
+
+class TokenCountBatcher:
+    """
+    Pack document chunks into embedding batches by token budget
+
+    OpenAI caps each embeddings request at 8191 tokens; packing batches to
+    ~90% of that limit minimizes the number of HTTP round-trips instead of
+    relying on the client's fixed-count batching, which either overflows the
+    limit or leaves requests underfilled.
+    """
+
+    def __init__(self,
+                 model: str = "text-embedding-3-small",
+                 max_tokens: int = 7400,
+                 max_items: int = 2048):
+        self.encoding = tiktoken.encoding_for_model(model)
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+
+    def count_tokens(self, text: str) -> int:
+        """Count model tokens in a piece of text"""
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def batches(self, documents: Iterable[Document]):
+        """Yield lists of documents greedily packed under the token budget"""
+        batch: List[Document] = []
+        batch_tokens = 0
+
+        for doc in documents:
+            n_tokens = self.count_tokens(doc.page_content)
+            if batch and (batch_tokens + n_tokens > self.max_tokens
+                          or len(batch) >= self.max_items):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(doc)
+            batch_tokens += n_tokens
+
+        if batch:
+            yield batch
+
+
 class SOMDataLoader:
     """
     MindShift SOM Data Loading and Embedding Pipeline
     Mirrors the n8n 'Load Data Flow' functionality
     """
-    
+
+    # Below this many chunks the interactive embedding path is faster than
+    # waiting on a batch job, so batch_mode falls back to it
+    BATCH_MODE_MIN_CHUNKS = 100
+
+    # At this many chunks Chroma's per-insert HNSW writes and pickling
+    # dominate; the auto backend choice switches to FAISS, and the FAISS
+    # store itself moves from a flat index to HNSW
+    FAISS_BACKEND_MIN_CHUNKS = 100_000
+
+
     def __init__(self, 
                  docs_directory: str = "./som_documents",
                  collection_name: str = "som_mindshift",
                  persist_directory: str = "./chroma_db",
-                 chunk_size: int = 1000,
-                 chunk_overlap: int = 200):
+                 chunk_size: int = 400,
+                 chunk_overlap: int = 60,
+                 embed_cache_path: str = "./embed_cache.db",
+                 vectorstore_backend: Optional[str] = None):
         """
         Initialize the SOM Data Loader
-        
+
         Args:
             docs_directory: Path to directory containing .docx files
             collection_name: Name for ChromaDB collection
             persist_directory: Directory to persist ChromaDB data
-            chunk_size: Size of text chunks for splitting
-            chunk_overlap: Overlap between chunks
+            chunk_size: Size of text chunks for splitting, in model tokens
+            chunk_overlap: Overlap between chunks, in model tokens
+            embed_cache_path: SQLite file caching embeddings by content hash
+            vectorstore_backend: "chroma" or "faiss"; None picks Chroma for
+                small corpora and FAISS above FAISS_BACKEND_MIN_CHUNKS
         """
         self.docs_directory = Path(docs_directory)
         self.collection_name = collection_name
         self.persist_directory = Path(persist_directory)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.embed_cache_path = embed_cache_path
+        self.vectorstore_backend = vectorstore_backend
+        self.faiss_index = None
         
         # Initialize components
         self.text_splitter = None
@@ -73,21 +318,11 @@ class SOMDataLoader:
             raise ValueError("OPENAI_API_KEY environment variable not set")
     
     def setup_text_splitter(self) -> None:
-        """Initialize the RecursiveCharacterTextSplitter"""
-        logger.info("Setting up RecursiveCharacterTextSplitter...")
-        
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=[
-                "\n\n",  # Split on double newlines (paragraphs)
-                "\n",   # Split on single newlines
-                " ",    # Split on spaces
-                "",     # Split on characters
-            ]
-        )
-        
+        """Initialize the StructuralTextSplitter"""
+        logger.info("Setting up StructuralTextSplitter...")
+
+        self.text_splitter = get_text_splitter(self.chunk_size, self.chunk_overlap)
+
         logger.info(f"✅ Text splitter configured: chunk_size={self.chunk_size}, overlap={self.chunk_overlap}")
     
     def setup_embeddings(self) -> None:
@@ -101,69 +336,82 @@ class SOMDataLoader:
         
         logger.info("✅ OpenAI Embeddings initialized")
     
-    def load_documents(self) -> List[Document]:
+    def iter_documents(self) -> Iterator[Document]:
         """
-        Load all .docx files from the documents directory
-        
-        Returns:
-            List of Document objects
+        Yield Documents as their .docx files finish parsing
+
+        Each parse is CPU-bound (zip decompress + XML walk), so the files
+        fan out across worker processes; documents stream out in completion
+        order instead of waiting for the whole directory, which lets the
+        splitter and embedder start while later files are still parsing.
         """
         logger.info(f"Loading documents from: {self.docs_directory}")
-        
+
         if not self.docs_directory.exists():
             raise FileNotFoundError(f"Documents directory not found: {self.docs_directory}")
-        
-        documents = []
-        
-        # Load .docx files manually since DirectoryLoader doesn't handle them by default
-        for docx_file in self.docs_directory.glob("*.docx"):
-            try:
-                from docx import Document as DocxDocument
-                
-                doc = DocxDocument(docx_file)
-                content_parts = []
-                
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():
-                        content_parts.append(paragraph.text.strip())
-                
-                content = "\n".join(content_parts)
-                
-                if content.strip():  # Only add non-empty files
-                    doc_obj = Document(
+
+        docx_files = sorted(self.docs_directory.glob("*.docx"))
+
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {executor.submit(_read_docx, f): f for f in docx_files}
+            for future in as_completed(futures):
+                docx_file = futures[future]
+                try:
+                    content = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Error loading {docx_file.name}: {e}")
+                    continue
+
+                if content.strip():  # Only yield non-empty files
+                    logger.info(f"✅ Loaded {docx_file.name}: {len(content)} characters")
+                    yield Document(
                         page_content=content,
                         metadata={"source": str(docx_file), "filename": docx_file.name}
                     )
-                    documents.append(doc_obj)
-                    logger.info(f"✅ Loaded {docx_file.name}: {len(content)} characters")
-                
-            except Exception as e:
-                logger.error(f"❌ Error loading {docx_file.name}: {e}")
-        
+
+    def load_documents(self) -> List[Document]:
+        """
+        Load all .docx files from the documents directory
+
+        Returns:
+            List of Document objects
+        """
+        documents = list(self.iter_documents())
+
         if not documents:
             raise ValueError(f"No valid documents found in {self.docs_directory}")
-        
+
         logger.info(f"✅ Successfully loaded {len(documents)} documents")
         return documents
     
+    def iter_chunks(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Split documents one at a time, yielding chunks as they are produced
+
+        Accepts any iterable, so chained onto iter_documents the splitter
+        runs while later files are still parsing and chunks flow straight
+        into the embedder without the whole corpus being resident at once.
+        """
+        if not self.text_splitter:
+            self.setup_text_splitter()
+
+        for document in documents:
+            yield from self.text_splitter.split_documents([document])
+
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
         Split documents into chunks using RecursiveCharacterTextSplitter
-        
+
         Args:
             documents: List of Document objects to split
-            
+
         Returns:
             List of split Document chunks
         """
         logger.info("Splitting documents into chunks...")
-        
-        if not self.text_splitter:
-            self.setup_text_splitter()
-        
-        # Split documents
-        split_docs = self.text_splitter.split_documents(documents)
-        
+
+        split_docs = list(self.iter_chunks(documents))
+
         logger.info(f"✅ Split into {len(split_docs)} chunks")
         
         # Log chunk statistics
@@ -179,40 +427,483 @@ class SOMDataLoader:
         
         return split_docs
     
-    def create_vectorstore(self, documents: List[Document]) -> Chroma:
+    def create_vectorstore(self, documents: Iterable[Document]) -> Optional[Chroma]:
         """
-        Create ChromaDB vector store and store document chunks with embeddings
-        
+        Create the vector store and persist document chunks with embeddings
+
         Args:
-            documents: List of Document chunks to store
-            
+            documents: Document chunks to store; any iterable works, and a
+                lazy one (iter_chunks over iter_documents) streams straight
+                through embedding into the store
+
         Returns:
-            ChromaDB vector store instance
+            ChromaDB vector store instance, or None for the FAISS backend
         """
-        logger.info("Creating ChromaDB vector store...")
-        
+        logger.info("Creating vector store...")
+
         if not self.embeddings:
             self.setup_embeddings()
-        
+
         # Create persistent directory
         self.persist_directory.mkdir(exist_ok=True)
-        
-        # Create ChromaDB vector store
-        self.vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
+
+        backend = self.vectorstore_backend
+        if backend is None:
+            backend = ("faiss" if isinstance(documents, list)
+                       and len(documents) >= self.FAISS_BACKEND_MIN_CHUNKS
+                       else "chroma")
+
+        if backend == "faiss":
+            # FAISS builds one index up front, so materialize the stream
+            documents = list(self._dedupe_chunks(documents))
+            self._create_faiss_store(documents, self._embed_documents(documents))
+            return self.vectorstore
+
+        self._open_collection(fresh=True)
+
+        # Stream: chunks arriving from the (possibly still-running) loader
+        # and splitter are packed, embedded and inserted with bounded
+        # in-flight batches, so peak memory is O(queue depth) and the
+        # network waits overlap the upstream CPU work
+        added = asyncio.run(self._ingest_stream(self._dedupe_chunks(documents)))
+
+        logger.info(f"✅ Vector store created and persisted to: {self.persist_directory}")
+        logger.info(f"✅ Collection name: {self.collection_name} ({added} chunks)")
+
+        return self.vectorstore
+
+    @staticmethod
+    def _dedupe_chunks(documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Drop chunks whose text was already seen, merging source attribution
+
+        The SOM documents share template headers and boilerplate, and each
+        repeat would otherwise be embedded and indexed separately. Dropped
+        duplicates append their filename to the kept chunk's "sources"
+        metadata (a comma-joined string - Chroma metadata values must be
+        scalars). Streams, so it plugs into the lazy pipeline; a duplicate
+        arriving after its original was already inserted is still dropped,
+        only the attribution merge is best-effort.
+        """
+        seen: Dict[str, Document] = {}
+        dropped = 0
+
+        for doc in documents:
+            digest = hashlib.blake2b(doc.page_content.encode("utf-8"),
+                                     digest_size=16).hexdigest()
+            kept = seen.get(digest)
+            if kept is None:
+                seen[digest] = doc
+                yield doc
+                continue
+
+            dropped += 1
+            filename = doc.metadata.get("filename", "")
+            sources = kept.metadata.get("sources") or kept.metadata.get("filename", "")
+            if filename and filename not in sources.split(", "):
+                kept.metadata["sources"] = f"{sources}, {filename}" if sources else filename
+
+        if dropped:
+            logger.info(f"  📊 Deduplicated {dropped} identical chunks")
+
+    def _embed_documents(self, documents: List[Document]) -> np.ndarray:
+        """
+        Embed a materialized chunk list through the cache + async batch path
+
+        Returns one contiguous float32 array of shape (N, dim) in document
+        order - a single buffer instead of N lists of boxed Python floats,
+        which costs ~10x the memory of the underlying data.
+        """
+        # Partition chunks into cache hits and misses, so a re-run over
+        # unchanged content costs no API calls at all
+        cache = self._open_embed_cache()
+        keys = [self._embedding_cache_key(doc.page_content) for doc in documents]
+        cached = self._load_cached_embeddings(cache, keys)
+        misses = [doc for doc, key in zip(documents, keys) if key not in cached]
+
+        logger.info(f"  📊 Embedding cache: {len(documents) - len(misses)} hits, "
+                    f"{len(misses)} misses")
+
+        # Pack the misses against the token limit and embed them concurrently
+        if misses:
+            batcher = TokenCountBatcher()
+            batches = list(batcher.batches(misses))
+            batch_vectors = asyncio.run(self._embed_batches_async(batches))
+
+            new_rows = []
+            for batch, vectors in zip(batches, batch_vectors):
+                for doc, vector in zip(batch, vectors):
+                    key = self._embedding_cache_key(doc.page_content)
+                    cached[key] = self._normalize_and_cache(key, vector, new_rows)
+
+            cache.executemany("INSERT OR REPLACE INTO cache (key, vec) VALUES (?, ?)",
+                              new_rows)
+            cache.commit()
+            logger.info(f"✅ Embedded {len(misses)} chunks in {len(batches)} token-packed batches")
+
+        cache.close()
+
+        # Pack into one contiguous (N, dim) buffer in original chunk order
+        emb = np.empty((len(documents), _EMBEDDING_DIM), dtype=np.float32)
+        for i, key in enumerate(keys):
+            emb[i] = cached[key]
+        return emb
+
+    @staticmethod
+    def _normalize_and_cache(key: str, vector: List[float], rows: list) -> np.ndarray:
+        """
+        Normalize a fresh embedding and queue its FP16 blob for the cache
+
+        Normalizing once means cosine distance reduces to an inner product,
+        and half-precision storage shrinks the cache from 6 KB to 3 KB per
+        vector with negligible recall loss for OpenAI embeddings.
+        """
+        vec = np.asarray(vector, dtype=np.float32)
+        vec /= np.linalg.norm(vec)
+        rows.append((key, vec.astype(np.float16).tobytes()))
+        return vec
+
+    async def _ingest_stream(self, documents: Iterable[Document],
+                             max_concurrency: int = 16,
+                             max_inflight_batches: int = 8) -> int:
+        """
+        Pack, embed and insert a chunk stream with bounded in-flight batches
+
+        The batch iterator pulls from the lazy chunk stream on an executor
+        thread, so upstream parsing/splitting advances only as fast as the
+        embedder drains it; each packed batch is embedded (through the disk
+        cache) and inserted as its own task, overlapping the HTTP waits.
+
+        Returns:
+            Number of chunks inserted
+        """
+        loop = asyncio.get_running_loop()
+        client = _make_async_openai()
+        cache = self._open_embed_cache()
+        collection = self.vectorstore._collection
+        semaphore = asyncio.Semaphore(max_concurrency)
+        batch_iter = TokenCountBatcher().batches(documents)
+        sentinel = object()
+        added = 0
+
+        async def embed_and_insert(start: int, batch: List[Document]) -> None:
+            nonlocal added
+            keys = [self._embedding_cache_key(doc.page_content) for doc in batch]
+            found = self._load_cached_embeddings(cache, keys)
+            misses = [doc for doc, key in zip(batch, keys) if key not in found]
+
+            if misses:
+                async with semaphore:
+                    response = await client.embeddings.create(
+                        model="text-embedding-3-small",
+                        input=[doc.page_content for doc in misses]
+                    )
+                new_rows: list = []
+                for doc, item in zip(misses, response.data):
+                    key = self._embedding_cache_key(doc.page_content)
+                    found[key] = self._normalize_and_cache(key, item.embedding, new_rows)
+                cache.executemany("INSERT OR REPLACE INTO cache (key, vec) VALUES (?, ?)",
+                                  new_rows)
+                cache.commit()
+
+            # One contiguous float32 buffer per batch; .tolist() only at the
+            # Chroma boundary, which validates plain Python floats
+            emb = np.empty((len(batch), _EMBEDDING_DIM), dtype=np.float32)
+            for i, key in enumerate(keys):
+                emb[i] = found[key]
+
+            collection.add(
+                ids=[f"chunk-{start + i}" for i in range(len(batch))],
+                embeddings=emb.tolist(),
+                documents=[doc.page_content for doc in batch],
+                metadatas=[doc.metadata for doc in batch]
+            )
+            added += len(batch)
+
+        tasks: List[asyncio.Task] = []
+        pending: set = set()
+        offset = 0
+
+        try:
+            while True:
+                # next() may block on docx parsing/splitting; run it off the
+                # event loop so in-flight embeddings keep progressing
+                batch = await loop.run_in_executor(None, next, batch_iter, sentinel)
+                if batch is sentinel:
+                    break
+
+                task = asyncio.create_task(embed_and_insert(offset, batch))
+                offset += len(batch)
+                tasks.append(task)
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+                if len(pending) >= max_inflight_batches:
+                    await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            await client.close()
+            cache.close()
+
+        return added
+
+
+    def _create_faiss_store(self, documents: List[Document],
+                            embeddings_np: np.ndarray) -> None:
+        """
+        Build and persist a FAISS index with a JSONL document sidecar
+
+        Vectors are already unit-normalized, so inner product equals cosine
+        similarity; small corpora get an exact IndexFlatIP while large ones
+        get HNSW with the same build parameters used for Chroma.
+        """
+        if faiss is None:
+            raise ImportError("faiss-cpu is required for the faiss backend. "
+                              "Run: pip install faiss-cpu")
+
+        self.persist_directory.mkdir(exist_ok=True)
+
+        if len(documents) >= self.FAISS_BACKEND_MIN_CHUNKS:
+            index = faiss.IndexHNSWFlat(_EMBEDDING_DIM, 32)
+            index.hnsw.efConstruction = 200
+        else:
+            index = faiss.IndexFlatIP(_EMBEDDING_DIM)
+
+        index.add(embeddings_np.astype(np.float32))
+        faiss.write_index(index, str(self.persist_directory / "index.faiss"))
+
+        # Documents and metadata ride alongside the index, one JSON per line
+        # in the same order as the vectors
+        with open(self.persist_directory / "documents.jsonl", "w", encoding="utf-8") as f:
+            for i, doc in enumerate(documents):
+                f.write(json.dumps({
+                    "id": f"chunk-{i}",
+                    "text": doc.page_content,
+                    "metadata": doc.metadata
+                }))
+                f.write("\n")
+
+        self.faiss_index = index
+        logger.info(f"✅ FAISS index ({type(index).__name__}) written with "
+                    f"{index.ntotal} vectors")
+
+    def _open_collection(self, fresh: bool = False) -> Chroma:
+        """
+        Open the persistent collection via the native chromadb client
+
+        Tunes the HNSW build parameters at creation time and wraps the
+        collection in the LangChain Chroma interface for query-side use.
+        Chroma >= 0.4 persists automatically, so no explicit persist()
+        calls are needed after inserts.
+
+        fresh=True drops any existing collection first. Full ingests write
+        fixed chunk-N ids and chromadb's add silently skips ids that
+        already exist, so inserting into a populated collection would keep
+        serving the stale vectors (and keep chunks of removed documents).
+        """
+        client = chromadb.PersistentClient(path=str(self.persist_directory))
+        if fresh:
+            try:
+                client.delete_collection(self.collection_name)
+            except Exception:
+                pass  # nothing persisted under this name yet
+        client.get_or_create_collection(
+            self.collection_name,
+            metadata=_CHROMA_HNSW_METADATA
+        )
+        self.vectorstore = Chroma(
+            client=client,
             collection_name=self.collection_name,
-            persist_directory=str(self.persist_directory)
+            embedding_function=self.embeddings
         )
-        
-        # Persist the vector store
-        self.vectorstore.persist()
-        
+        return self.vectorstore
+
+    def _add_in_batches(self, documents: List[Document],
+                        embeddings: List[List[float]]) -> None:
+        """Insert chunks with their vectors in fixed-size batches"""
+        collection = self.vectorstore._collection
+        for start in range(0, len(documents), _CHROMA_ADD_BATCH_SIZE):
+            batch = documents[start:start + _CHROMA_ADD_BATCH_SIZE]
+            collection.add(
+                ids=[f"chunk-{start + i}" for i in range(len(batch))],
+                embeddings=embeddings[start:start + _CHROMA_ADD_BATCH_SIZE],
+                documents=[doc.page_content for doc in batch],
+                metadatas=[doc.metadata for doc in batch]
+            )
+
+    @staticmethod
+    def _embedding_cache_key(text: str) -> str:
+        """Content-addressed cache key: hash of model name + chunk text"""
+        payload = ("text-embedding-3-small" + "\x00" + text).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _open_embed_cache(self) -> sqlite3.Connection:
+        """Open (creating if needed) the on-disk embedding cache"""
+        cache = sqlite3.connect(self.embed_cache_path)
+        cache.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, vec BLOB)")
+        return cache
+
+    @staticmethod
+    def _load_cached_embeddings(cache: sqlite3.Connection,
+                                keys: List[str]) -> Dict[str, np.ndarray]:
+        """Bulk-fetch cached vectors for the given keys as float32 arrays"""
+        found: Dict[str, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        # SQLite caps bound parameters per statement, so select in slices
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = cache.execute(
+                f"SELECT key, vec FROM cache WHERE key IN ({placeholders})", chunk
+            )
+            for key, blob in rows:
+                # Vectors are stored FP16; skip anything of the wrong width
+                # (e.g. rows from an older FP32 cache) so it is re-embedded
+                # and overwritten
+                if len(blob) != _EMBEDDING_DIM * 2:
+                    continue
+                found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+        return found
+
+    async def _embed_batches_async(self, batches: List[List[Document]],
+                                   max_concurrency: int = 16) -> List[List[List[float]]]:
+        """
+        Embed token-packed batches concurrently via AsyncOpenAI
+
+        The per-batch HTTP calls are pure I/O waits (~400 ms each), so
+        fanning them out with asyncio.gather overlaps the round-trips; the
+        semaphore keeps concurrency inside OpenAI's rate limits.
+
+        Args:
+            batches: Lists of Document chunks, one list per request
+            max_concurrency: Maximum in-flight embedding requests
+
+        Returns:
+            One list of embedding vectors per batch, in batch order
+        """
+        client = _make_async_openai()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def embed_batch(batch: List[Document]) -> List[List[float]]:
+            async with semaphore:
+                response = await client.embeddings.create(
+                    model="text-embedding-3-small",
+                    input=[doc.page_content for doc in batch]
+                )
+                return [item.embedding for item in response.data]
+
+        try:
+            return await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        finally:
+            await client.close()
+
+    def embed_via_batch_api(self, documents: List[Document],
+                            poll_interval: float = 30.0) -> List[List[float]]:
+        """
+        Embed document chunks through the OpenAI Batch API
+
+        The batch endpoint prices embeddings at half the interactive rate and
+        removes per-request round-trips from the pipeline, at the cost of
+        polling for job completion. Worth it for a one-time bulk ingest.
+
+        Args:
+            documents: List of Document chunks to embed
+            poll_interval: Seconds between job status polls
+
+        Returns:
+            List of embedding vectors in the same order as documents
+        """
+        logger.info(f"Submitting {len(documents)} chunks to the OpenAI Batch API...")
+
+        client = OpenAI()
+
+        # One JSONL request line per chunk, keyed by position
+        lines = []
+        for i, doc in enumerate(documents):
+            lines.append(json.dumps({
+                "custom_id": f"chunk-{i}",
+                "method": "POST",
+                "url": "/v1/embeddings",
+                "body": {
+                    "model": "text-embedding-3-small",
+                    "input": doc.page_content
+                }
+            }))
+        payload = "\n".join(lines).encode("utf-8")
+
+        batch_file = client.files.create(
+            file=("som_embeddings.jsonl", payload),
+            purpose="batch"
+        )
+
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/embeddings",
+            completion_window="24h"
+        )
+        logger.info(f"✅ Batch job created: {batch.id}")
+
+        # Poll until the job reaches a terminal state
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+            logger.info(f"  ⏳ Batch status: {batch.status}")
+
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch job {batch.id} ended with status: {batch.status}")
+
+        # Download results and restore original chunk order via custom_id
+        output = client.files.content(batch.output_file_id)
+        embeddings: List[List[float]] = [None] * len(documents)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            index = int(result["custom_id"].split("-")[1])
+            embeddings[index] = result["response"]["body"]["data"][0]["embedding"]
+
+        missing = sum(1 for e in embeddings if e is None)
+        if missing:
+            raise RuntimeError(f"Batch job returned no embedding for {missing} chunks")
+
+        logger.info(f"✅ Batch embedding completed: {len(embeddings)} vectors")
+        return embeddings
+
+    def create_vectorstore_from_embeddings(self, documents: List[Document],
+                                           embeddings: List[List[float]]) -> Chroma:
+        """
+        Store chunks with precomputed embeddings in ChromaDB
+
+        Bypasses Chroma.from_documents so the already-computed batch vectors
+        are inserted directly instead of being re-embedded.
+
+        Args:
+            documents: List of Document chunks to store
+            embeddings: Embedding vector per chunk, same order
+
+        Returns:
+            ChromaDB vector store instance
+        """
+        logger.info("Creating ChromaDB vector store from precomputed embeddings...")
+
+        if not self.embeddings:
+            self.setup_embeddings()
+
+        self.persist_directory.mkdir(exist_ok=True)
+
+        # Open the collection empty, then add chunks with their vectors
+        self._open_collection(fresh=True)
+        self._add_in_batches(documents, embeddings)
+
         logger.info(f"✅ Vector store created and persisted to: {self.persist_directory}")
         logger.info(f"✅ Collection name: {self.collection_name}")
-        
+
         return self.vectorstore
-    
+
     def get_collection_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the created collection
@@ -220,6 +911,16 @@ class SOMDataLoader:
         Returns:
             Dictionary with collection statistics
         """
+        if self.faiss_index is not None:
+            return {
+                "collection_name": self.collection_name,
+                "persist_directory": str(self.persist_directory),
+                "total_documents": self.faiss_index.ntotal,
+                "embedding_model": "text-embedding-3-small",
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap
+            }
+
         if not self.vectorstore:
             return {"error": "Vector store not initialized"}
         
@@ -242,10 +943,48 @@ class SOMDataLoader:
             logger.error(f"Error getting collection stats: {e}")
             return {"error": str(e)}
     
-    def run_pipeline(self) -> Dict[str, Any]:
+    def _ingest_up_to_date(self) -> bool:
+        """
+        True when the persisted collection already covers the source files
+
+        Compares the sentinel written after the last successful ingest
+        against the newest .docx mtime, and confirms the collection is
+        non-empty. Lets a streamlit restart reuse the store in under a
+        second instead of re-running the whole pipeline.
+        """
+        sentinel = self.persist_directory / ".ingest_mtime"
+        if not sentinel.exists():
+            return False
+
+        try:
+            client = chromadb.PersistentClient(path=str(self.persist_directory))
+            collection = client.get_or_create_collection(self.collection_name)
+            if collection.count() == 0:
+                return False
+        except Exception as e:
+            logger.warning(f"Could not inspect existing collection: {e}")
+            return False
+
+        docx_files = list(self.docs_directory.glob("*.docx"))
+        if not docx_files:
+            return False
+
+        max_src_mtime = max(f.stat().st_mtime for f in docx_files)
+        return sentinel.stat().st_mtime >= max_src_mtime
+
+    def _mark_ingest_complete(self) -> None:
+        """Stamp the sentinel file that gates the skip check"""
+        (self.persist_directory / ".ingest_mtime").touch()
+
+    def run_pipeline(self, batch_mode: bool = False) -> Dict[str, Any]:
         """
         Run the complete data loading and embedding pipeline
-        
+
+        Args:
+            batch_mode: Embed via the OpenAI Batch API (half price, polled)
+                instead of interactive calls; small corpora below
+                BATCH_MODE_MIN_CHUNKS always use the interactive path
+
         Returns:
             Dictionary with pipeline results and statistics
         """
@@ -253,33 +992,70 @@ class SOMDataLoader:
         logger.info("=" * 60)
         
         try:
-            # Step 1: Load documents
-            logger.info("Step 1: Loading documents...")
-            documents = self.load_documents()
-            
-            # Step 2: Split documents
-            logger.info("Step 2: Splitting documents...")
-            split_docs = self.split_documents(documents)
-            
-            # Step 3: Setup embeddings
-            logger.info("Step 3: Setting up embeddings...")
             self.setup_embeddings()
-            
-            # Step 4: Create vector store
-            logger.info("Step 4: Creating vector store...")
-            vectorstore = self.create_vectorstore(split_docs)
-            
+
+            # Fast path: nothing changed since the last successful ingest,
+            # so reuse the persisted collection as-is
+            if self.vectorstore_backend in (None, "chroma") and self._ingest_up_to_date():
+                logger.info("⏭️ Sources unchanged since last ingest - reusing persisted collection")
+                self._open_collection()
+                return {
+                    "success": True,
+                    "skipped": True,
+                    "documents_loaded": 0,
+                    "chunks_created": 0,
+                    "collection_stats": self.get_collection_stats()
+                }
+
+            if batch_mode:
+                # The Batch API needs the full JSONL up front, so this path
+                # stays stage-sequential
+                documents = self.load_documents()
+                split_docs = self.split_documents(documents)
+
+                if len(split_docs) >= self.BATCH_MODE_MIN_CHUNKS:
+                    embeddings = self.embed_via_batch_api(split_docs)
+                    self.create_vectorstore_from_embeddings(split_docs, embeddings)
+                else:
+                    self.create_vectorstore(split_docs)
+
+                documents_loaded = len(documents)
+                chunks_created = len(split_docs)
+            else:
+                # Stream load → split → embed → insert so each stage starts
+                # as soon as the previous one produces work and peak memory
+                # stays at a few in-flight batches instead of the corpus
+                logger.info("Streaming documents through split → embed → insert...")
+                counts = {"documents": 0, "chunks": 0}
+
+                def counted(stream: Iterable[Document], key: str) -> Iterator[Document]:
+                    for item in stream:
+                        counts[key] += 1
+                        yield item
+
+                chunk_stream = counted(
+                    self.iter_chunks(counted(self.iter_documents(), "documents")),
+                    "chunks"
+                )
+                self.create_vectorstore(chunk_stream)
+
+                documents_loaded = counts["documents"]
+                chunks_created = counts["chunks"]
+                if not documents_loaded:
+                    raise ValueError(f"No valid documents found in {self.docs_directory}")
+
             # Get final statistics
             stats = self.get_collection_stats()
-            
+            self._mark_ingest_complete()
+
             logger.info("=" * 60)
             logger.info("🎉 Pipeline completed successfully!")
             logger.info("=" * 60)
             
             return {
                 "success": True,
-                "documents_loaded": len(documents),
-                "chunks_created": len(split_docs),
+                "documents_loaded": documents_loaded,
+                "chunks_created": chunks_created,
                 "collection_stats": stats
             }
             
@@ -312,12 +1088,12 @@ def main():
             docs_directory="./som_documents",
             collection_name="som_mindshift",
             persist_directory="./chroma_db",
-            chunk_size=1000,
-            chunk_overlap=200
+            chunk_size=400,
+            chunk_overlap=60
         )
         
-        # Run the pipeline
-        results = data_loader.run_pipeline()
+        # Run the pipeline (pass --batch to embed via the OpenAI Batch API)
+        results = data_loader.run_pipeline(batch_mode="--batch" in sys.argv)
         
         if results["success"]:
             print("\n✅ SUCCESS: Data loading and embedding completed!")
@@ -7,18 +7,20 @@ This script demonstrates the complete data loading and embedding pipeline
 that mirrors the n8n 'Load Data Flow' functionality.
 """
 
+import io
 import os
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 from dotenv import load_dotenv
 
 # LangChain imports
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
 
+from som_data_loader import get_text_splitter
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,15 +43,22 @@ def load_docx_documents(docs_directory: str) -> List[Document]:
             from docx import Document as DocxDocument
             
             doc = DocxDocument(docx_file)
-            content_parts = []
-            
+
+            # Accumulate into one StringIO writer - a single pass with no
+            # intermediate list retaining every paragraph string
+            buf = io.StringIO()
+            wrote = False
             for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    content_parts.append(paragraph.text.strip())
-            
-            content = "\n".join(content_parts)
-            
-            if content.strip():
+                text = paragraph.text
+                if text and not text.isspace():
+                    if wrote:
+                        buf.write("\n")
+                    buf.write(text.strip())
+                    wrote = True
+
+            content = buf.getvalue()
+
+            if content:
                 doc_obj = Document(
                     page_content=content,
                     metadata={"source": str(docx_file), "filename": docx_file.name}
@@ -63,17 +72,12 @@ def load_docx_documents(docs_directory: str) -> List[Document]:
     logger.info(f"📊 Total documents loaded: {len(documents)}")
     return documents
 
-def split_documents(documents: List[Document], chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Document]:
-    """Split documents into chunks using RecursiveCharacterTextSplitter"""
+def split_documents(documents: List[Document], chunk_size: int = 400, chunk_overlap: int = 60) -> List[Document]:
+    """Split documents into chunks using the shared splitter singleton"""
     logger.info("✂️ Splitting documents into chunks...")
-    
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]
-    )
-    
+
+    text_splitter = get_text_splitter(chunk_size, chunk_overlap)
+
     split_docs = text_splitter.split_documents(documents)
     
     # Calculate statistics
@@ -86,38 +90,79 @@ def split_documents(documents: List[Document], chunk_size: int = 1000, chunk_ove
     
     return split_docs
 
-def create_embeddings_and_vectorstore(documents: List[Document], 
+def _batched(documents: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    """Yield lists of up to size documents from any iterable"""
+    batch: List[Document] = []
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def create_embeddings_and_vectorstore(documents: Iterable[Document],
                                     collection_name: str = "som_mindshift",
-                                    persist_directory: str = "./chroma_db") -> Chroma:
-    """Create OpenAI embeddings and ChromaDB vector store"""
+                                    persist_directory: str = "./chroma_db",
+                                    batch_size: int = 512) -> Chroma:
+    """Create OpenAI embeddings and ChromaDB vector store
+
+    Embeds and inserts one batch at a time instead of handing the whole
+    corpus to Chroma.from_documents, so peak memory is a single batch of
+    vectors rather than the full corpus plus its embeddings.
+    """
     logger.info("🔮 Creating embeddings and vector store...")
-    
+
     # Initialize OpenAI Embeddings
     embeddings = OpenAIEmbeddings(
         model="text-embedding-3-small",
         openai_api_key=os.getenv("OPENAI_API_KEY")
     )
-    
+
     logger.info("✅ OpenAI Embeddings initialized")
-    
+
     # Create persistent directory
     persist_path = Path(persist_directory)
     persist_path.mkdir(exist_ok=True)
-    
-    # Create ChromaDB vector store
-    vectorstore = Chroma.from_documents(
-        documents=documents,
-        embedding=embeddings,
+
+    # Open the collection empty (Chroma >= 0.4 persists automatically),
+    # then drain the document stream batch by batch
+    vectorstore = Chroma(
         collection_name=collection_name,
+        embedding_function=embeddings,
         persist_directory=str(persist_path)
     )
-    
-    # Persist the vector store
-    vectorstore.persist()
-    
-    logger.info(f"✅ Vector store created: {collection_name}")
+
+    # A populated collection from an earlier run would silently swallow
+    # the fixed chunk-N ids (chromadb skips existing ids on add), turning
+    # a rerun into a no-op - drop it and start clean
+    if vectorstore._collection.count() > 0:
+        logger.info("♻️ Existing collection found - rebuilding it from scratch")
+        vectorstore.delete_collection()
+        vectorstore = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=str(persist_path)
+        )
+
+    collection = vectorstore._collection
+
+    offset = 0
+    for batch in _batched(documents, batch_size):
+        texts = [doc.page_content for doc in batch]
+        vectors = embeddings.embed_documents(texts)
+        collection.add(
+            ids=[f"chunk-{offset + i}" for i in range(len(batch))],
+            embeddings=vectors,
+            documents=texts,
+            metadatas=[doc.metadata for doc in batch]
+        )
+        offset += len(batch)
+        del vectors  # release the batch's embeddings before the next one
+
+    logger.info(f"✅ Vector store created: {collection_name} ({offset} chunks)")
     logger.info(f"✅ Persisted to: {persist_directory}")
-    
+
     return vectorstore
 
 def get_collection_stats(vectorstore: Chroma) -> Dict[str, Any]:
@@ -164,7 +209,7 @@ def main():
         # Step 2: Split documents
         print("\n✂️ Step 2: Splitting Documents")
         print("-" * 30)
-        split_docs = split_documents(documents, chunk_size=1000, chunk_overlap=200)
+        split_docs = split_documents(documents, chunk_size=400, chunk_overlap=60)
         
         # Step 3: Create embeddings and vector store
         print("\n🔮 Step 3: Creating Embeddings and Vector Store")
@@ -1,6 +1,9 @@
 import streamlit as st
+import html
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
+import markdown
 from mindshift_rag import MindShiftRAG
 from dotenv import load_dotenv
 
@@ -82,6 +85,34 @@ def initialize_rag_system():
         st.error(f"Error initializing RAG system: {e}")
         return None
 
+def append_message(role: str, content: str) -> dict:
+    """Append a chat message with its HTML rendered once, at append time
+
+    Re-rendering every message's Markdown on every rerun grows
+    quadratically with conversation length; caching the HTML per message
+    keeps each rerun's work proportional to the new message only.
+
+    Raw HTML in the content is escaped before the Markdown pass: the
+    rendered string is displayed with unsafe_allow_html=True, so a typed
+    <script> or onerror attribute would otherwise execute in the session.
+    """
+    message = {
+        "role": role,
+        "content": content,
+        "html": markdown.markdown(html.escape(content), extensions=["fenced_code"])
+    }
+    st.session_state.messages.append(message)
+    return message
+
+@st.cache_data(max_entries=256, ttl=3600, show_spinner=False)
+def cached_query(prompt: str) -> str:
+    """Answer a prompt through the RAG system, memoized across reruns
+
+    Repeated prompts (the sidebar example buttons are guaranteed repeats)
+    skip the embedding, retrieval and LLM calls entirely for an hour.
+    """
+    return st.session_state.rag_system.query(prompt)
+
 def main():
     """Main Streamlit application"""
     
@@ -100,7 +131,10 @@ def main():
     
     if rag_system is None:
         return
-    
+
+    # Make the system reachable from the cached query wrapper
+    st.session_state.rag_system = rag_system
+
     # Sidebar
     with st.sidebar:
         st.header("📚 About MindShift")
@@ -124,9 +158,14 @@ def main():
             "I always fail at relationships"
         ]
         
+        # Clicks queue up instead of firing one query per rerun; every
+        # prompt pending at the next drain is answered in a single wave
+        if "pending_prompts" not in st.session_state:
+            st.session_state.pending_prompts = []
+
         for belief in example_beliefs:
             if st.button(f"💭 {belief}", key=f"example_{belief}"):
-                st.session_state.user_input = belief
+                st.session_state.pending_prompts.append(belief)
     
     # Main chat interface
     st.header("💬 Chat with MindShift")
@@ -135,31 +174,59 @@ def main():
     if "messages" not in st.session_state:
         st.session_state.messages = []
     
-    # Display chat history
+    # Display chat history from the pre-rendered HTML
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+            if "html" in message:
+                st.markdown(message["html"], unsafe_allow_html=True)
+            else:
+                st.markdown(message["content"])
     
+    # Drain queued example prompts in one concurrent wave, so N clicks
+    # cost one overlapped round of embedding/LLM round-trips instead of
+    # N serial ones
+    if st.session_state.pending_prompts:
+        pending = st.session_state.pending_prompts
+        st.session_state.pending_prompts = []
+
+        def answer(prompt: str) -> str:
+            try:
+                return rag_system.query(prompt)
+            except Exception as e:
+                return f"I apologize, but I encountered an error: {e}"
+
+        with st.spinner("MindShift is thinking..."):
+            with ThreadPoolExecutor(max_workers=min(4, len(pending))) as executor:
+                responses = list(executor.map(answer, pending))
+
+        for prompt, response in zip(pending, responses):
+            user_msg = append_message("user", prompt)
+            bot_msg = append_message("assistant", response)
+            with st.chat_message("user"):
+                st.markdown(user_msg["html"], unsafe_allow_html=True)
+            with st.chat_message("assistant"):
+                st.markdown(bot_msg["html"], unsafe_allow_html=True)
+
     # Chat input
     if prompt := st.chat_input("Share your limiting belief..."):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        
+        user_msg = append_message("user", prompt)
+
         # Display user message
         with st.chat_message("user"):
-            st.markdown(prompt)
-        
+            st.markdown(user_msg["html"], unsafe_allow_html=True)
+
         # Generate and display assistant response
         with st.chat_message("assistant"):
             with st.spinner("MindShift is thinking..."):
                 try:
-                    response = rag_system.query(prompt)
-                    st.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+                    response = cached_query(prompt)
+                    bot_msg = append_message("assistant", response)
+                    st.markdown(bot_msg["html"], unsafe_allow_html=True)
                 except Exception as e:
                     error_msg = f"I apologize, but I encountered an error: {e}"
                     st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                    append_message("assistant", error_msg)
     
     # Footer
     st.markdown("---")
@@ -4,21 +4,139 @@ N8N Connection Test Script
 Tests the n8n webhook connection and validates the integration
 """
 
-import os
-import requests
+import io
+import sys
+import asyncio
 import json
-import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+import httpx
+
+from config import env
+
+# orjson serializes straight to bytes and is several times faster than the
+# stdlib encoder; fall back to json when it is not installed
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+# Payload templates for every test event, with __TS__ standing in for the
+# send-time timestamp. They are JSON-encoded to bytes once per tester, so
+# sending an event is a bytes.replace instead of a full dict serialization.
+_EVENT_TEMPLATES = {
+    "test_connection": {
+        "event": "test_connection",
+        "timestamp": "__TS__",
+        "data": {
+            "message": "Testing n8n webhook connection from Mindshift app",
+            "test_type": "connectivity",
+            "source": "mindshift-app"
+        },
+        "source": "mindshift-app"
+    },
+    "chat_interaction": {
+        "event": "chat_interaction",
+        "userId": "test_user_123",
+        "timestamp": "__TS__",
+        "data": {
+            "message": "I can't succeed because I'm not experienced enough",
+            "response": "Let me help you reframe that belief using SOM patterns...",
+            "mode": "reframe",
+            "sessionId": "test_session_456"
+        },
+        "source": "mindshift-app"
+    },
+    "mood_logged": {
+        "event": "mood_logged",
+        "userId": "test_user_123",
+        "timestamp": "__TS__",
+        "data": {
+            "moodValue": 7,
+            "moodLabel": "Good",
+            "notes": "Feeling optimistic about my progress"
+        },
+        "source": "mindshift-app"
+    },
+    "journal_entry": {
+        "event": "journal_entry",
+        "userId": "test_user_123",
+        "timestamp": "__TS__",
+        "data": {
+            "title": "Reflecting on my limiting beliefs",
+            "content": "Today I realized that my belief about not being experienced enough is holding me back...",
+            "entryDate": "__TS__"
+        },
+        "source": "mindshift-app"
+    },
+    "goal_action": {
+        "event": "goal_action",
+        "userId": "test_user_123",
+        "timestamp": "__TS__",
+        "data": {
+            "title": "Practice SOM patterns daily",
+            "completed": False,
+            "action": "created"
+        },
+        "source": "mindshift-app"
+    }
+}
+
 class N8NConnectionTester:
     """Test n8n webhook connection and integration"""
-    
+
     def __init__(self, webhook_url: Optional[str] = None):
-        self.webhook_url = webhook_url or os.getenv("N8N_WEBHOOK_URL")
+        self.webhook_url = webhook_url or env("N8N_WEBHOOK_URL")
         self.test_results = []
-    
-    def test_webhook_connection(self) -> Dict[str, Any]:
+        self._payloads = {
+            event_type: _dumps(template)
+            for event_type, template in _EVENT_TEMPLATES.items()
+        }
+
+    def _render_payload(self, event_type: str) -> bytes:
+        """Stamp the current timestamp into a pre-encoded payload"""
+        timestamp = datetime.now().isoformat().encode("ascii")
+        return self._payloads[event_type].replace(b"__TS__", timestamp)
+
+    async def _post_with_backoff(self, client: httpx.AsyncClient, payload: bytes,
+                                 max_retries: int = 2) -> httpx.Response:
+        """POST the payload, pausing only when the server asks for it
+
+        Healthy responses go straight through with no delay. A 429 or
+        5xx triggers a retry after the server's Retry-After hint when
+        present, otherwise a doubling fallback delay.
+        """
+        delay = 1.0
+        response = None
+        for attempt in range(max_retries + 1):
+            response = await client.post(
+                self.webhook_url,
+                content=payload,
+                headers={"Content-Type": "application/json"}
+            )
+
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            if attempt == max_retries:
+                break
+
+            retry_after = response.headers.get("Retry-After")
+            try:
+                wait = float(retry_after) if retry_after else delay
+            except ValueError:
+                wait = delay
+            await asyncio.sleep(wait)
+            delay *= 2
+
+        return response
+
+    async def test_webhook_connection(self, client: httpx.AsyncClient) -> Dict[str, Any]:
         """Test basic webhook connectivity"""
         if not self.webhook_url:
             return {
@@ -26,26 +144,12 @@ class N8NConnectionTester:
                 "error": "No webhook URL configured",
                 "message": "Set N8N_WEBHOOK_URL environment variable or pass webhook_url parameter"
             }
-        
-        test_data = {
-            "event": "test_connection",
-            "timestamp": datetime.now().isoformat(),
-            "data": {
-                "message": "Testing n8n webhook connection from Mindshift app",
-                "test_type": "connectivity",
-                "source": "mindshift-app"
-            },
-            "source": "mindshift-app"
-        }
-        
+
         try:
-            response = requests.post(
-                self.webhook_url,
-                json=test_data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
+            response = await self._post_with_backoff(
+                client, self._render_payload("test_connection")
             )
-            
+
             if response.status_code == 200:
                 return {
                     "success": True,
@@ -60,14 +164,14 @@ class N8NConnectionTester:
                     "error": f"HTTP {response.status_code}: {response.text}",
                     "message": "Webhook responded with error"
                 }
-                
-        except requests.exceptions.Timeout:
+
+        except httpx.TimeoutException:
             return {
                 "success": False,
                 "error": "Connection timeout",
                 "message": "Webhook did not respond within 10 seconds"
             }
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             return {
                 "success": False,
                 "error": "Connection error",
@@ -79,73 +183,24 @@ class N8NConnectionTester:
                 "error": str(e),
                 "message": "Unexpected error occurred"
             }
-    
-    def test_chat_event(self) -> Dict[str, Any]:
+
+    async def test_chat_event(self, client: httpx.AsyncClient) -> Dict[str, Any]:
         """Test chat interaction event"""
-        test_data = {
-            "event": "chat_interaction",
-            "userId": "test_user_123",
-            "timestamp": datetime.now().isoformat(),
-            "data": {
-                "message": "I can't succeed because I'm not experienced enough",
-                "response": "Let me help you reframe that belief using SOM patterns...",
-                "mode": "reframe",
-                "sessionId": "test_session_456"
-            },
-            "source": "mindshift-app"
-        }
-        
-        return self._send_test_event(test_data, "chat_interaction")
-    
-    def test_mood_event(self) -> Dict[str, Any]:
+        return await self._send_test_event(client, "chat_interaction")
+
+    async def test_mood_event(self, client: httpx.AsyncClient) -> Dict[str, Any]:
         """Test mood logging event"""
-        test_data = {
-            "event": "mood_logged",
-            "userId": "test_user_123",
-            "timestamp": datetime.now().isoformat(),
-            "data": {
-                "moodValue": 7,
-                "moodLabel": "Good",
-                "notes": "Feeling optimistic about my progress"
-            },
-            "source": "mindshift-app"
-        }
-        
-        return self._send_test_event(test_data, "mood_logged")
-    
-    def test_journal_event(self) -> Dict[str, Any]:
+        return await self._send_test_event(client, "mood_logged")
+
+    async def test_journal_event(self, client: httpx.AsyncClient) -> Dict[str, Any]:
         """Test journal entry event"""
-        test_data = {
-            "event": "journal_entry",
-            "userId": "test_user_123",
-            "timestamp": datetime.now().isoformat(),
-            "data": {
-                "title": "Reflecting on my limiting beliefs",
-                "content": "Today I realized that my belief about not being experienced enough is holding me back...",
-                "entryDate": datetime.now().isoformat()
-            },
-            "source": "mindshift-app"
-        }
-        
-        return self._send_test_event(test_data, "journal_entry")
-    
-    def test_goal_event(self) -> Dict[str, Any]:
+        return await self._send_test_event(client, "journal_entry")
+
+    async def test_goal_event(self, client: httpx.AsyncClient) -> Dict[str, Any]:
         """Test goal tracking event"""
-        test_data = {
-            "event": "goal_action",
-            "userId": "test_user_123",
-            "timestamp": datetime.now().isoformat(),
-            "data": {
-                "title": "Practice SOM patterns daily",
-                "completed": False,
-                "action": "created"
-            },
-            "source": "mindshift-app"
-        }
-        
-        return self._send_test_event(test_data, "goal_action")
-    
-    def _send_test_event(self, data: Dict[str, Any], event_type: str) -> Dict[str, Any]:
+        return await self._send_test_event(client, "goal_action")
+
+    async def _send_test_event(self, client: httpx.AsyncClient, event_type: str) -> Dict[str, Any]:
         """Send a test event to the webhook"""
         if not self.webhook_url:
             return {
@@ -153,15 +208,12 @@ class N8NConnectionTester:
                 "error": "No webhook URL configured",
                 "event_type": event_type
             }
-        
+
         try:
-            response = requests.post(
-                self.webhook_url,
-                json=data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
+            response = await self._post_with_backoff(
+                client, self._render_payload(event_type)
             )
-            
+
             if response.status_code == 200:
                 return {
                     "success": True,
@@ -176,104 +228,126 @@ class N8NConnectionTester:
                     "status_code": response.status_code,
                     "error": f"HTTP {response.status_code}: {response.text}"
                 }
-                
+
         except Exception as e:
             return {
                 "success": False,
                 "event_type": event_type,
                 "error": str(e)
             }
-    
-    def run_all_tests(self) -> Dict[str, Any]:
-        """Run all webhook tests"""
-        print("🧪 Testing N8N Webhook Connection")
-        print("=" * 50)
-        
-        if not self.webhook_url:
-            print("❌ No webhook URL configured")
-            print("Please set N8N_WEBHOOK_URL environment variable")
-            return {"success": False, "error": "No webhook URL"}
-        
-        print(f"🔗 Testing webhook: {self.webhook_url}")
-        print()
-        
-        tests = [
-            ("Basic Connection", self.test_webhook_connection),
-            ("Chat Event", self.test_chat_event),
-            ("Mood Event", self.test_mood_event),
-            ("Journal Event", self.test_journal_event),
-            ("Goal Event", self.test_goal_event)
-        ]
-        
-        results = {}
-        passed = 0
-        total = len(tests)
-        
-        for test_name, test_func in tests:
-            print(f"📋 Testing {test_name}...")
-            result = test_func()
-            results[test_name] = result
-            
-            if result["success"]:
-                print(f"✅ {test_name}: PASSED")
-                passed += 1
+
+    async def run_all_tests_async(self) -> Dict[str, Any]:
+        """Run all webhook tests concurrently over one shared connection"""
+        # Interactive runs print as they go; piped/CI output is buffered
+        # and flushed as a single stdout write at the end
+        out = sys.stdout if sys.stdout.isatty() else io.StringIO()
+
+        try:
+            print("🧪 Testing N8N Webhook Connection", file=out)
+            print("=" * 50, file=out)
+
+            if not self.webhook_url:
+                print("❌ No webhook URL configured", file=out)
+                print("Please set N8N_WEBHOOK_URL environment variable", file=out)
+                return {"success": False, "error": "No webhook URL"}
+
+            print(f"🔗 Testing webhook: {self.webhook_url}", file=out)
+            print(file=out)
+
+            tests = [
+                ("Basic Connection", self.test_webhook_connection),
+                ("Chat Event", self.test_chat_event),
+                ("Mood Event", self.test_mood_event),
+                ("Journal Event", self.test_journal_event),
+                ("Goal Event", self.test_goal_event)
+            ]
+
+            # One client for all tests keeps the TCP connection alive, and
+            # gather overlaps the five round-trips instead of paying for them
+            # one after another
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                test_results = await asyncio.gather(
+                    *(test_func(client) for _, test_func in tests)
+                )
+
+            results = {}
+            passed = 0
+            total = len(tests)
+
+            for (test_name, _), result in zip(tests, test_results):
+                results[test_name] = result
+
+                if result["success"]:
+                    print(f"✅ {test_name}: PASSED", file=out)
+                    passed += 1
+                else:
+                    print(f"❌ {test_name}: FAILED", file=out)
+                    if "error" in result:
+                        print(f"   Error: {result['error']}", file=out)
+                print(file=out)
+
+            # Summary
+            print("=" * 50, file=out)
+            print(f"📊 Test Results: {passed}/{total} tests passed", file=out)
+
+            if passed == total:
+                print("🎉 All tests passed! N8N connection is working correctly.", file=out)
             else:
-                print(f"❌ {test_name}: FAILED")
-                if "error" in result:
-                    print(f"   Error: {result['error']}")
-            
-            # Small delay between tests
-            time.sleep(1)
-            print()
-        
-        # Summary
-        print("=" * 50)
-        print(f"📊 Test Results: {passed}/{total} tests passed")
-        
-        if passed == total:
-            print("🎉 All tests passed! N8N connection is working correctly.")
-        else:
-            print("⚠️ Some tests failed. Check the errors above.")
-        
-        return {
-            "success": passed == total,
-            "passed": passed,
-            "total": total,
-            "results": results
-        }
+                print("⚠️ Some tests failed. Check the errors above.", file=out)
+
+            return {
+                "success": passed == total,
+                "passed": passed,
+                "total": total,
+                "results": results
+            }
+        finally:
+            if out is not sys.stdout:
+                sys.stdout.write(out.getvalue())
+
+    def run_all_tests(self) -> Dict[str, Any]:
+        """Run all webhook tests (sync wrapper)"""
+        return asyncio.run(self.run_all_tests_async())
+
+    def run_single_test(self, test_func) -> Dict[str, Any]:
+        """Run one async test method with its own short-lived client"""
+        async def _run():
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                return await test_func(client)
+
+        return asyncio.run(_run())
 
 def main():
     """Main function to test n8n connection"""
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="Test N8N webhook connection")
     parser.add_argument("--webhook-url", help="N8N webhook URL to test")
-    parser.add_argument("--test-type", choices=["all", "connection", "chat", "mood", "journal", "goal"], 
+    parser.add_argument("--test-type", choices=["all", "connection", "chat", "mood", "journal", "goal"],
                        default="all", help="Type of test to run")
-    
+
     args = parser.parse_args()
-    
+
     # Initialize tester
     tester = N8NConnectionTester(args.webhook_url)
-    
+
     if args.test_type == "all":
         tester.run_all_tests()
     elif args.test_type == "connection":
-        result = tester.test_webhook_connection()
+        result = tester.run_single_test(tester.test_webhook_connection)
         print("Connection test result:", result)
     elif args.test_type == "chat":
-        result = tester.test_chat_event()
+        result = tester.run_single_test(tester.test_chat_event)
         print("Chat event test result:", result)
     elif args.test_type == "mood":
-        result = tester.test_mood_event()
+        result = tester.run_single_test(tester.test_mood_event)
         print("Mood event test result:", result)
     elif args.test_type == "journal":
-        result = tester.test_journal_event()
+        result = tester.run_single_test(tester.test_journal_event)
         print("Journal event test result:", result)
     elif args.test_type == "goal":
-        result = tester.test_goal_event()
+        result = tester.run_single_test(tester.test_goal_event)
         print("Goal event test result:", result)
 
 if __name__ == "__main__":
     main()
-
@@ -6,39 +6,34 @@ Tests the system with sample limiting beliefs
 
 import os
 import sys
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from config import env
 
 def test_rag_system():
     """Test the RAG system with sample queries"""
-    
+
     # Check if OpenAI API key is set
-    if not os.getenv("OPENAI_API_KEY"):
+    if not env("OPENAI_API_KEY"):
         print("❌ Error: OPENAI_API_KEY environment variable not set")
         print("Please set your OpenAI API key in a .env file")
         return False
     
     try:
-        # Import the RAG system
-        from mindshift_rag import MindShiftRAG
-        
+        # Import the shared, memoized RAG instance builder
+        from _rag_cache import get_rag
+
         print("🧠 Initializing MindShift RAG System...")
-        
-        # Initialize the system
-        rag_system = MindShiftRAG()
-        
+
         # Check if documents exist
         docs_directory = "./som_documents"
         if not os.path.exists(docs_directory):
             print(f"❌ Documents directory '{docs_directory}' not found")
             print("Please run: python3 download_documents.py")
             return False
-        
-        # Initialize the system
-        rag_system.initialize_system(docs_directory)
-        
+
+        # Build and initialize once; repeat calls reuse the same instance
+        rag_system = get_rag(docs_directory)
+
         # Get collection stats
         stats = rag_system.get_collection_stats()
         print(f"✅ System initialized! Loaded {stats.get('total_documents', 0)} documents")
@@ -3,33 +3,27 @@
 Test the RAG system with actual documents
 """
 
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from config import env
 
 def test_rag_with_real_docs():
     """Test the RAG system with actual documents"""
-    
+
     # Check if OpenAI API key is set
-    if not os.getenv("OPENAI_API_KEY"):
+    if not env("OPENAI_API_KEY"):
         print("❌ OPENAI_API_KEY not set. Please set it in .env file")
         print("You can get an API key from: https://platform.openai.com/api-keys")
         return False
     
     try:
-        from mindshift_rag import MindShiftRAG
-        
+        from _rag_cache import get_rag
+
         print("🧠 Testing MindShift RAG with real documents...")
-        
-        # Initialize the system
-        rag_system = MindShiftRAG()
-        
-        # Initialize with actual documents
+
+        # Shared, memoized instance: initialization happens once even if
+        # several test scripts run in the same interpreter
         docs_directory = "./som_documents"
-        rag_system.initialize_system(docs_directory)
-        
+        rag_system = get_rag(docs_directory)
+
         # Get collection stats
         stats = rag_system.get_collection_stats()
         print(f"✅ System initialized! Loaded {stats.get('total_documents', 0)} documents")
@@ -4,24 +4,74 @@ Supabase Connection Test Script
 Tests the Supabase database connection and verifies the schema
 """
 
-import os
+import io
+import sys
+import asyncio
+import time
 import requests
 import json
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from urllib3.util.retry import Retry
+
+from config import env
+from testing.http import KeepAliveAdapter
+
+# Separate connect/read timeouts: a healthy Supabase endpoint answers these
+# probes well within this, so a dead one fails in seconds instead of ten
+_TIMEOUT = (1.0, 2.0)
+
 class SupabaseConnectionTester:
     """Test Supabase connection and database schema"""
-    
+
+    REQUIRED_TABLES = ["profiles", "chat_messages", "mood_logs", "achievements",
+                       "goals", "chat_sessions", "journal_entries"]
+
+    # How long a fetched schema stays valid before it is re-requested
+    SCHEMA_CACHE_TTL = 300.0
+
     def __init__(self, supabase_url: Optional[str] = None, supabase_key: Optional[str] = None):
-        self.supabase_url = supabase_url or os.getenv("VITE_SUPABASE_URL")
-        self.supabase_key = supabase_key or os.getenv("VITE_SUPABASE_ANON_KEY")
+        self.supabase_url = supabase_url or env("VITE_SUPABASE_URL")
+        self.supabase_key = supabase_key or env("VITE_SUPABASE_ANON_KEY")
         self.headers = {
             "apikey": self.supabase_key,
             "Authorization": f"Bearer {self.supabase_key}",
             "Content-Type": "application/json"
         }
-    
+
+        # One session for every probe: the TLS handshake to Supabase is
+        # paid once and the connection is reused across all the tests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Transient failures retry at the transport layer with a short
+        # backoff; anything past two retries surfaces as a real error
+        retries = Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=["GET", "POST", "HEAD"]
+        )
+        adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._schema_cache: Optional[set] = None
+        self._schema_cache_time = 0.0
+
+    def close(self):
+        """Close the pooled session"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
     def test_connection(self) -> Dict[str, Any]:
         """Test basic Supabase connection"""
         if not self.supabase_url or not self.supabase_key:
@@ -33,33 +83,41 @@ class SupabaseConnectionTester:
         
         try:
             # Test connection by querying profiles table
-            response = requests.get(
+            # Range: 0-0 asks PostgREST for at most one row and Prefer:
+            # count=none skips the table count, so the probe does no real
+            # query work; stream=True defers the body download and only
+            # the failure branch pays for it when it reads response.text
+            response = self.session.get(
                 f"{self.supabase_url}/rest/v1/profiles",
-                headers=self.headers,
-                params={"select": "count"},
-                timeout=10
+                headers={"Range": "0-0", "Prefer": "count=none"},
+                timeout=_TIMEOUT,
+                stream=True
             )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "message": "Supabase connection successful",
-                    "url": self.supabase_url
-                }
-            else:
-                return {
-                    "success": False,
-                    "status_code": response.status_code,
-                    "error": f"HTTP {response.status_code}: {response.text}",
-                    "message": "Supabase connection failed"
-                }
+
+            try:
+                # 206 Partial Content is the normal answer to a Range request
+                if response.status_code in (200, 206):
+                    return {
+                        "success": True,
+                        "status_code": response.status_code,
+                        "message": "Supabase connection successful",
+                        "url": self.supabase_url
+                    }
+                else:
+                    return {
+                        "success": False,
+                        "status_code": response.status_code,
+                        "error": f"HTTP {response.status_code}: {response.text}",
+                        "message": "Supabase connection failed"
+                    }
+            finally:
+                response.close()
                 
         except requests.exceptions.Timeout:
             return {
                 "success": False,
                 "error": "Connection timeout",
-                "message": "Supabase did not respond within 10 seconds"
+                "message": "Supabase did not respond within the timeout"
             }
         except requests.exceptions.ConnectionError:
             return {
@@ -74,51 +132,104 @@ class SupabaseConnectionTester:
                 "message": "Unexpected error occurred"
             }
     
-    def test_tables(self) -> Dict[str, Any]:
-        """Test if all required tables exist"""
-        tables = ["profiles", "chat_messages", "mood_logs", "achievements", "goals", "chat_sessions", "journal_entries"]
-        results = {}
-        
-        for table in tables:
+    def _fetch_schema_tables(self) -> set:
+        """Fetch the set of tables PostgREST exposes, cached for a short TTL
+
+        The OpenAPI description at /rest/v1/ lists every table in one
+        response, so existence checks need one request instead of one
+        probe per table.
+        """
+        now = time.monotonic()
+        if (self._schema_cache is not None
+                and now - self._schema_cache_time < self.SCHEMA_CACHE_TTL):
+            return self._schema_cache
+
+        response = self.session.get(f"{self.supabase_url}/rest/v1/", timeout=_TIMEOUT)
+        response.raise_for_status()
+        spec = response.json()
+
+        # PostgREST describes tables under definitions (Swagger 2.0);
+        # fall back to path names if a deployment omits them
+        tables = set(spec.get("definitions") or ())
+        if not tables:
+            tables = {path.strip("/") for path in spec.get("paths", ()) if path != "/"}
+
+        self._schema_cache = tables
+        self._schema_cache_time = now
+        return tables
+
+    async def test_tables_async(self) -> Dict[str, Any]:
+        """Test if all required tables exist, probing them concurrently"""
+        tables = self.REQUIRED_TABLES
+
+        # HEAD returns only the status line, so existence checks carry no
+        # response body, and gather overlaps the probes over the pooled
+        # session instead of walking the tables one by one
+        async def probe(table: str) -> Dict[str, Any]:
             try:
-                response = requests.get(
+                response = await asyncio.to_thread(
+                    self.session.head,
                     f"{self.supabase_url}/rest/v1/{table}",
-                    headers=self.headers,
-                    params={"select": "count"},
-                    timeout=5
+                    headers={"Range": "0-0", "Prefer": "count=none"},
+                    timeout=_TIMEOUT
                 )
-                
-                if response.status_code == 200:
-                    results[table] = {"exists": True, "status": "OK"}
+
+                if response.status_code in (200, 206):
+                    return {"exists": True, "status": "OK"}
                 else:
-                    results[table] = {"exists": False, "status": f"HTTP {response.status_code}"}
-                    
+                    return {"exists": False, "status": f"HTTP {response.status_code}"}
+
             except Exception as e:
-                results[table] = {"exists": False, "status": str(e)}
-        
-        return results
+                return {"exists": False, "status": str(e)}
+
+        probe_results = await asyncio.gather(*(probe(table) for table in tables))
+        return dict(zip(tables, probe_results))
+
+    def test_tables(self) -> Dict[str, Any]:
+        """Test if all required tables exist
+
+        One schema introspection answers for every table via set
+        intersection; the per-table HEAD probes remain as a fallback when
+        the OpenAPI endpoint is unavailable.
+        """
+        try:
+            available = self._fetch_schema_tables()
+        except Exception:
+            return asyncio.run(self.test_tables_async())
+
+        found = set(self.REQUIRED_TABLES) & available
+        return {
+            table: ({"exists": True, "status": "OK"} if table in found
+                    else {"exists": False, "status": "missing from schema"})
+            for table in self.REQUIRED_TABLES
+        }
     
     def test_auth(self) -> Dict[str, Any]:
         """Test Supabase Auth service"""
         try:
-            response = requests.get(
+            # Only the status code matters here, so never download the
+            # settings body
+            response = self.session.get(
                 f"{self.supabase_url}/auth/v1/settings",
-                headers={"apikey": self.supabase_key},
-                timeout=10
+                timeout=_TIMEOUT,
+                stream=True
             )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "message": "Auth service accessible",
-                    "status_code": response.status_code
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"Auth service error: HTTP {response.status_code}",
-                    "status_code": response.status_code
-                }
+
+            try:
+                if response.status_code == 200:
+                    return {
+                        "success": True,
+                        "message": "Auth service accessible",
+                        "status_code": response.status_code
+                    }
+                else:
+                    return {
+                        "success": False,
+                        "message": f"Auth service error: HTTP {response.status_code}",
+                        "status_code": response.status_code
+                    }
+            finally:
+                response.close()
                 
         except Exception as e:
             return {
@@ -129,71 +240,79 @@ class SupabaseConnectionTester:
     
     def run_all_tests(self) -> Dict[str, Any]:
         """Run all Supabase tests"""
-        print("🗄️ Testing Supabase Connection")
-        print("=" * 50)
-        
-        if not self.supabase_url or not self.supabase_key:
-            print("❌ No Supabase credentials configured")
-            print("Please set VITE_SUPABASE_URL and VITE_SUPABASE_ANON_KEY")
-            return {"success": False, "error": "No credentials"}
-        
-        print(f"🔗 Testing Supabase: {self.supabase_url}")
-        print()
-        
-        tests = [
-            ("Connection", self.test_connection),
-            ("Auth Service", self.test_auth),
-            ("Tables", self.test_tables)
-        ]
-        
-        results = {}
-        passed = 0
-        total = len(tests)
-        
-        for test_name, test_func in tests:
-            print(f"📋 Testing {test_name}...")
-            result = test_func()
-            results[test_name] = result
-            
-            if test_name == "Tables":
-                # Special handling for tables test
-                table_results = result
-                table_count = sum(1 for table_result in table_results.values() if table_result.get("exists", False))
-                total_tables = len(table_results)
-                
-                print(f"✅ {test_name}: {table_count}/{total_tables} tables found")
-                for table_name, table_result in table_results.items():
-                    status = "✅" if table_result.get("exists", False) else "❌"
-                    print(f"   {status} {table_name}: {table_result.get('status', 'Unknown')}")
-                
-                if table_count == total_tables:
-                    passed += 1
-            else:
-                if result.get("success", False):
-                    print(f"✅ {test_name}: PASSED")
-                    passed += 1
+        # Interactive runs print as they go; piped/CI output is buffered
+        # and flushed as a single stdout write at the end
+        out = sys.stdout if sys.stdout.isatty() else io.StringIO()
+
+        try:
+            print("🗄️ Testing Supabase Connection", file=out)
+            print("=" * 50, file=out)
+
+            if not self.supabase_url or not self.supabase_key:
+                print("❌ No Supabase credentials configured", file=out)
+                print("Please set VITE_SUPABASE_URL and VITE_SUPABASE_ANON_KEY", file=out)
+                return {"success": False, "error": "No credentials"}
+
+            print(f"🔗 Testing Supabase: {self.supabase_url}", file=out)
+            print(file=out)
+
+            tests = [
+                ("Connection", self.test_connection),
+                ("Auth Service", self.test_auth),
+                ("Tables", self.test_tables)
+            ]
+
+            results = {}
+            passed = 0
+            total = len(tests)
+
+            for test_name, test_func in tests:
+                print(f"📋 Testing {test_name}...", file=out)
+                result = test_func()
+                results[test_name] = result
+
+                if test_name == "Tables":
+                    # Special handling for tables test
+                    table_results = result
+                    table_count = sum(1 for table_result in table_results.values() if table_result.get("exists", False))
+                    total_tables = len(table_results)
+
+                    print(f"✅ {test_name}: {table_count}/{total_tables} tables found", file=out)
+                    for table_name, table_result in table_results.items():
+                        status = "✅" if table_result.get("exists", False) else "❌"
+                        print(f"   {status} {table_name}: {table_result.get('status', 'Unknown')}", file=out)
+
+                    if table_count == total_tables:
+                        passed += 1
                 else:
-                    print(f"❌ {test_name}: FAILED")
-                    if "error" in result:
-                        print(f"   Error: {result['error']}")
-            
-            print()
-        
-        # Summary
-        print("=" * 50)
-        print(f"📊 Test Results: {passed}/{total} tests passed")
-        
-        if passed == total:
-            print("🎉 All tests passed! Supabase connection is working correctly.")
-        else:
-            print("⚠️ Some tests failed. Check the errors above.")
-        
-        return {
-            "success": passed == total,
-            "passed": passed,
-            "total": total,
-            "results": results
-        }
+                    if result.get("success", False):
+                        print(f"✅ {test_name}: PASSED", file=out)
+                        passed += 1
+                    else:
+                        print(f"❌ {test_name}: FAILED", file=out)
+                        if "error" in result:
+                            print(f"   Error: {result['error']}", file=out)
+
+                print(file=out)
+
+            # Summary
+            print("=" * 50, file=out)
+            print(f"📊 Test Results: {passed}/{total} tests passed", file=out)
+
+            if passed == total:
+                print("🎉 All tests passed! Supabase connection is working correctly.", file=out)
+            else:
+                print("⚠️ Some tests failed. Check the errors above.", file=out)
+
+            return {
+                "success": passed == total,
+                "passed": passed,
+                "total": total,
+                "results": results
+            }
+        finally:
+            if out is not sys.stdout:
+                sys.stdout.write(out.getvalue())
 
 def main():
     """Main function to test Supabase connection"""
@@ -205,11 +324,9 @@ def main():
     
     args = parser.parse_args()
     
-    # Initialize tester
-    tester = SupabaseConnectionTester(args.url, args.key)
-    
-    # Run tests
-    tester.run_all_tests()
+    # Initialize tester and run tests
+    with SupabaseConnectionTester(args.url, args.key) as tester:
+        tester.run_all_tests()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP plumbing for the test scripts
+One keep-alive adapter and one pooled session, built once per process
+"""
+
+import functools
+import socket
+import sys
+
+import requests
+from requests.adapters import HTTPAdapter
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets enable TCP keep-alive
+
+    Idle connections start probing after 30s, give up after three missed
+    probes 10s apart, and TCP_USER_TIMEOUT caps how long unacked data can
+    sit before the connection is declared dead — so a silently dropped
+    connection is noticed by the kernel instead of stalling a later probe
+    until its full request timeout.
+    """
+
+    _SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        _SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        _SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10))
+    if hasattr(socket, "TCP_KEEPCNT"):
+        _SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3))
+    if sys.platform == "linux":
+        # TCP_USER_TIMEOUT is option 18 on Linux; older Pythons lack the constant
+        _SOCKET_OPTIONS.append((socket.IPPROTO_TCP, getattr(socket, "TCP_USER_TIMEOUT", 18), 15000))
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self._SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+@functools.lru_cache(maxsize=1)
+def shared_session() -> requests.Session:
+    """Process-wide pooled session for ad-hoc requests from test scripts
+
+    Scripts that fire the occasional request without their own session
+    share this one instead of opening a fresh connection per call.
+    """
+    session = requests.Session()
+    adapter = KeepAliveAdapter(pool_connections=8, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session